@@ -0,0 +1,78 @@
+"""Application handling the updates of different users concurrently."""
+import asyncio
+from collections import deque
+
+from telegram import Update
+from telegram.ext import Application
+
+from config import create_logger
+
+logger = create_logger(__name__)
+
+
+class UserOrderedApplication(Application):
+    """Application running the updates of one user in order, of different users in parallel.
+
+    Built with ``concurrent_updates``, every update gets its own task. An
+    update of a user whose previous update is still being handled is queued
+    for that user and its task returns at once, the task already handling the
+    user's updates handles the queued ones next, in arrival order. So the
+    conversation state and user data of a user are never changed by two
+    handlers at once, and a user sending many updates holds a single
+    concurrent update slot. At most ``max_in_flight`` updates are handled at
+    the same time, queued updates do not count. ``stop`` handles the queued
+    updates before the application stops, as it does for ``update_queue``.
+    """
+
+    def __init__(self, *args, max_in_flight: int = 32, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        # updates of the users being handled, the first one is in progress
+        self._user_updates: dict[int, deque[object]] = {}
+        # tasks handling the updates of a user, until its queue is empty
+        self._user_tasks: set[asyncio.Task] = set()
+
+    async def process_update(self, update: object) -> None:
+        key = _user_key(update)
+        if key is None:
+            async with self._in_flight:
+                await super().process_update(update)
+            return
+
+        pending = self._user_updates.get(key)
+        if pending is not None:
+            pending.append(update)
+            return
+
+        pending = self._user_updates[key] = deque([update])
+        task = asyncio.current_task()
+        if task is not None:
+            self._user_tasks.add(task)
+        try:
+            while pending:
+                try:
+                    async with self._in_flight:
+                        await super().process_update(pending[0])
+                except Exception as e:
+                    # the queued updates of the user are still handled
+                    logger.exception(e)
+                pending.popleft()
+        finally:
+            del self._user_updates[key]
+            self._user_tasks.discard(task)  # type: ignore[arg-type]
+
+    async def stop(self) -> None:
+        # the queued updates were taken off update_queue already
+        while self._user_tasks:
+            await asyncio.gather(*self._user_tasks, return_exceptions=True)
+        await super().stop()
+
+
+def _user_key(update: object) -> int | None:
+    if not isinstance(update, Update):
+        return None
+    if update.effective_user is not None:
+        return update.effective_user.id
+    if update.effective_chat is not None:
+        return update.effective_chat.id
+    return None
@@ -1,26 +1,167 @@
+import asyncio
+import pathlib
 import sqlite3
+import threading
+import time
 from abc import ABC, abstractmethod
 from collections import defaultdict
-from dataclasses import dataclass
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone, tzinfo
+from functools import partial
+from typing import Awaitable, Callable, Iterator, TypeVar
 
-from config import MONTH_START_DAY
+from config import MONTH_START_DAY, config
 
+T = TypeVar("T")
 
-def calculate_date() -> str:
-    today = datetime.today()
-    year = today.year
-    month = today.month
-    day = today.day
-    if day >= MONTH_START_DAY:
-        return f"{year}-{month}-{MONTH_START_DAY}"
-    else:
-        if month == 1:
-            month = 12
-            year -= 1
-        else:
-            month -= 1
-        return f"{year}-{month}-{MONTH_START_DAY}"
+MIGRATIONS_DIR = pathlib.Path(__file__).parent / "migrations"
+ROLLUP_SCHEMA_VERSION = 3
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection, target: int | None = None) -> int:
+    """Apply migrations newer than the database schema version.
+
+    Migrations are ``NNNN_name.sql`` files in MIGRATIONS_DIR, each one runs in
+    its own transaction together with the bump of ``PRAGMA user_version``.
+    """
+    version = get_schema_version(conn)
+    for migration in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        migration_version = int(migration.stem.split("_")[0])
+        if migration_version <= version:
+            continue
+        if target is not None and migration_version > target:
+            break
+        conn.executescript(
+            f"BEGIN;\n{migration.read_text()}\n"
+            f"PRAGMA user_version = {migration_version};\nCOMMIT;"
+        )
+        version = migration_version
+    return version
+
+
+JOURNAL_MODES = ("delete", "truncate", "persist", "wal")
+SYNCHRONOUS_LEVELS = ("off", "normal", "full", "extra")
+TEMP_STORES = ("default", "file", "memory")
+
+
+@dataclass(frozen=True)
+class ConnectionProfile:
+    """Pragmas applied to every sqlite connection when it is opened.
+
+    ``cache_size`` follows the pragma: negative values are KiB, positive are
+    pages. ``mmap_size`` is in bytes and ``busy_timeout`` in milliseconds.
+    """
+
+    journal_mode: str = "delete"
+    synchronous: str = "full"
+    mmap_size: int = 0
+    cache_size: int = -2000
+    temp_store: str = "default"
+    busy_timeout: int = 5000
+
+    def __post_init__(self) -> None:
+        if self.journal_mode not in JOURNAL_MODES:
+            raise ValueError(f"Unknown journal mode {self.journal_mode}")
+        if self.synchronous not in SYNCHRONOUS_LEVELS:
+            raise ValueError(f"Unknown synchronous level {self.synchronous}")
+        if self.temp_store not in TEMP_STORES:
+            raise ValueError(f"Unknown temp store {self.temp_store}")
+
+    def apply(self, conn: sqlite3.Connection, read_only: bool = False) -> None:
+        # pragma values can not be bound, they are validated above
+        if not read_only:
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+            conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute(f"PRAGMA cache_size = {int(self.cache_size)}")
+        conn.execute(f"PRAGMA temp_store = {self.temp_store}")
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout)}")
+
+
+CONNECTION_PROFILES = {
+    # sqlite defaults: rollback journal, a report read blocks commits
+    "rollback": ConnectionProfile(),
+    # readers and the writer do not block each other, commits fsync only the log
+    "wal": ConnectionProfile(
+        journal_mode="wal",
+        synchronous="normal",
+        mmap_size=256 * 1024 * 1024,
+        cache_size=-64 * 1024,
+        temp_store="memory",
+    ),
+}
+
+
+class PeriodCalendar:
+    """Billing periods starting on ``start_day`` of every month.
+
+    A period is the ``YYYY-MM-DD`` date of its first day, so it compares as a
+    string with CREATED_AT timestamps and rollup periods. Dates are taken in
+    ``tz``, UTC by default like the CURRENT_TIMESTAMP stored in CREATED_AT.
+    The periods are computed once a day, reports ask for them on every request.
+    """
+
+    def __init__(self, start_day: int = MONTH_START_DAY, tz: tzinfo = timezone.utc):
+        self._start_day = start_day
+        self._tz = tz
+        self._day: date | None = None
+        # starts of the current period and the previous ones, newest first
+        self._periods: list[str] = []
+
+    def today(self) -> date:
+        return datetime.now(self._tz).date()
+
+    def current(self) -> str:
+        return self.periods(1)[0]
+
+    def periods(self, count: int) -> list[str]:
+        """Starts of the current period and of the ``count - 1`` previous ones, newest first."""
+        today = self.today()
+        if today != self._day or len(self._periods) < count:
+            self._periods = self._periods_until(today, count)
+            self._day = today
+        return self._periods[:count]
+
+    def _periods_until(self, today: date, count: int) -> list[str]:
+        year, month = today.year, today.month
+        if today.day < self._start_day:
+            year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+        periods = []
+        for _ in range(count):
+            periods.append(f"{year}-{month:02}-{self._start_day:02}")
+            year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+        return periods
+
+
+period_calendar = PeriodCalendar()
+
+
+def period_range(first: str, last: str) -> list[str]:
+    """Starts of every billing period from ``first`` to ``last``, both ``YYYY-MM-DD``."""
+    year, month = int(first[:4]), int(first[5:7])
+    periods = []
+    while (period := f"{year}-{month:02}-{MONTH_START_DAY:02}") <= last:
+        periods.append(period)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return periods
+
+
+def period_start_sql(column: str) -> str:
+    """SQL expression of the billing period start (``YYYY-MM-DD``) of a timestamp column."""
+    return (
+        f"CASE WHEN CAST(strftime('%d', {column}) AS INTEGER) >= {MONTH_START_DAY} "
+        f"THEN date({column}, 'start of month', '+{MONTH_START_DAY - 1} days') "
+        f"ELSE date({column}, 'start of month', '-1 month', '+{MONTH_START_DAY - 1} days') END"
+    )
+
+
+PERIOD_START = period_start_sql("CREATED_AT")
 
 
 @dataclass(frozen=True)
@@ -54,8 +195,18 @@ class ReportRequest:
     user: User
     group: Group
     ordering: str
-    start: str = calculate_date()
+    # start of the current billing period when the request is made
+    start: str = field(default_factory=period_calendar.current)
     all: bool = False
+    # sort key of the last row of the previous page, empty for the first page
+    after: tuple = ()
+
+
+@dataclass(frozen=True)
+class ExpensesPage:
+    expenses: dict[int, Expense]
+    # sort key to request the following page with, empty on the last page
+    next_page: tuple = ()
 
 
 class DataBaseClient(ABC):
@@ -68,7 +219,7 @@ class DataBaseClient(ABC):
         ...
 
     @abstractmethod
-    def create_group(self, user_id: int, name: str) -> None:
+    def create_group(self, user_id: int, name: str) -> Group:
         ...
 
     @abstractmethod
@@ -87,6 +238,10 @@ class DataBaseClient(ABC):
     def insert(self, expense: Expense) -> int:
         ...
 
+    @abstractmethod
+    def insert_many(self, expenses: list[Expense]) -> list[int]:
+        ...
+
     @abstractmethod
     def get_expenses_total(
         self, request: ReportRequest
@@ -94,7 +249,7 @@ class DataBaseClient(ABC):
         ...
 
     @abstractmethod
-    def get_expenses_last(self, request: ReportRequest) -> dict[int, Expense]:
+    def get_expenses_last(self, request: ReportRequest, limit: int) -> ExpensesPage:
         ...
 
     @abstractmethod
@@ -111,6 +266,10 @@ class DataBaseClient(ABC):
     def del_expense(self, id: int) -> None:
         ...
 
+    @abstractmethod
+    def del_expenses(self, ids: list[int]) -> None:
+        ...
+
     @abstractmethod
     def update_expense_category(
         self, current_category_id: int, new_category: int
@@ -118,13 +277,21 @@ class DataBaseClient(ABC):
         ...
 
     @abstractmethod
-    def insert_category(self, category: str, group: Group) -> None:
+    def move_expenses(self, ids: list[int], new_category: int) -> None:
+        ...
+
+    @abstractmethod
+    def insert_category(self, category: str, group: Group) -> int:
         ...
 
     @abstractmethod
     def delete_category(self, category: int, group: Group) -> None:
         ...
 
+    @abstractmethod
+    def rebuild_rollup(self) -> None:
+        ...
+
     @abstractmethod
     def _create_database(self) -> None:
         ...
@@ -142,77 +309,190 @@ class DataBaseClient(ABC):
         ...
 
 
+# keys are the report ordering callbacks from constants.callbacks, values are
+# unique ascending sort keys, so pages can continue after the key of a row
+ORDERINGS = {
+    "created_at": "e.CREATED_AT, e.ID",
+    "category, amount desc": "coalesce(c.CATEGORY, ''), -e.AMOUNT, e.ID",
+}
+
+
+def get_ordering(ordering: str) -> str:
+    if ordering not in ORDERINGS:
+        raise ValueError(f"Unknown ordering {ordering}")
+    return ORDERINGS[ordering]
+
+
+class ConnectionManager:
+    """Connections to one sqlite database file.
+
+    Writes go through a single connection, one transaction at a time. Every
+    thread reads through its own read-only connection, so reports run in
+    parallel with each other and, in WAL mode, with the writer. Cursors are
+    created per call and never shared.
+    """
+
+    def __init__(self, path: str, profile: ConnectionProfile) -> None:
+        self._path = path
+        self._profile = profile
+        self._writer = sqlite3.connect(path, check_same_thread=False)
+        profile.apply(self._writer)
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        self._readers: list[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Cursor]:
+        """Cursor in a write transaction, committed when the block succeeds."""
+        with self._write_lock, self._writer:
+            cur = self._writer.cursor()
+            try:
+                yield cur
+            finally:
+                cur.close()
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Cursor]:
+        """Cursor on the read-only connection of the calling thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect_reader()
+        cur = conn.cursor()
+        try:
+            yield cur
+        finally:
+            cur.close()
+
+    def close(self) -> None:
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+        with self._write_lock:
+            self._writer.close()
+
+    def _connect_reader(self) -> sqlite3.Connection:
+        uri = f"{pathlib.Path(self._path).absolute().as_uri()}?mode=ro"
+        # closed by close() from another thread
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self._profile.apply(conn, read_only=True)
+        with self._readers_lock:
+            self._readers.append(conn)
+        return conn
+
+
 class SqliteClient(DataBaseClient):
-    def __init__(self) -> None:
-        self._conn = sqlite3.connect("expenses.db")
-        self._cur = self._conn.cursor()
+    def __init__(
+        self,
+        path: str = "expenses.db",
+        profile: ConnectionProfile = CONNECTION_PROFILES["wal"],
+    ) -> None:
+        self._path = path
+        self._connections = ConnectionManager(path, profile)
         self._create_database()
 
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def close(self) -> None:
+        self._connections.close()
+
     def register_user(self, user_id: int, username: str) -> None:
-        self._cur.execute(
-            f"INSERT OR IGNORE INTO users(USER_ID, USERNAME) VALUES({user_id}, '{username}')"
-        )
-        self._conn.commit()
+        with self._connections.write() as cur:
+            cur.execute(
+                "INSERT OR IGNORE INTO users(USER_ID, USERNAME) VALUES(?, ?)",
+                (user_id, username),
+            )
 
     def is_user_registred(self, user: User) -> bool:
-        self._cur.execute(f"SELECT ID FROM users WHERE USER_ID = {user.id}")
-        return len(self._cur.fetchall()) > 0
-
-    def create_group(self, user_id: int, name: str) -> None:
-        self._cur.execute(
-            f"INSERT OR REPLACE INTO groups(NAME, CREATOR, activerecord) VALUES('{name}', {user_id}, 1)"
-        )
-        self._conn.commit()
-        group_id = self._cur.lastrowid
-        self._cur.execute(
-            f"INSERT OR IGNORE INTO user_groups(USER_ID, GROUP_ID) VALUES({user_id}, {group_id})"
-        )
-        self._conn.commit()
+        with self._connections.read() as cur:
+            cur.execute("SELECT ID FROM users WHERE USER_ID = ?", (user.id,))
+            return cur.fetchone() is not None
+
+    def create_group(self, user_id: int, name: str) -> Group:
+        with self._connections.write() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO groups(NAME, CREATOR, activerecord) VALUES(?, ?, 1)",
+                (name, user_id),
+            )
+            group_id = cur.lastrowid
+            cur.execute(
+                "INSERT OR IGNORE INTO user_groups(USER_ID, GROUP_ID) VALUES(?, ?)",
+                (user_id, group_id),
+            )
+        return Group(group_id or -1, name)
 
     def delete_group(self, group: Group) -> None:
-        self._cur.execute(f"UPDATE groups SET activerecord = 0 WHERE id = {group.id}")
-        self._conn.commit()
+        with self._connections.write() as cur:
+            cur.execute("UPDATE groups SET activerecord = 0 WHERE id = ?", (group.id,))
 
     def add_user_to_group(self, group: Group, user: User) -> None:
-        self._cur.execute(
-            f"INSERT OR IGNORE INTO user_groups(USER_ID, GROUP_ID) VALUES({user.id}, {group.id})"
-        )
-        self._conn.commit()
+        with self._connections.write() as cur:
+            cur.execute(
+                "INSERT OR IGNORE INTO user_groups(USER_ID, GROUP_ID) VALUES(?, ?)",
+                (user.id, group.id),
+            )
 
     def delete_user_from_group(self, group: Group, user: User) -> None:
-        self._cur.execute(
-            f"DELETE FROM user_groups WHERE group_id = {group.id} and USER_ID = {user.id}"
-        )
-        self._conn.commit()
+        with self._connections.write() as cur:
+            cur.execute(
+                "DELETE FROM user_groups WHERE group_id = ? and USER_ID = ?",
+                (group.id, user.id),
+            )
 
     def load_categories(self, categories: dict[int, Category], group: Group) -> None:
-        self._cur.execute(
-            f"SELECT id, CATEGORY from categories WHERE activerecord = 1 and group_id = {group.id}"
-        )
-        for row in self._cur.fetchall():
-            categories[row[0]] = Category(*row)
+        with self._connections.read() as cur:
+            cur.execute(
+                "SELECT id, CATEGORY from categories WHERE activerecord = 1 and group_id = ?",
+                (group.id,),
+            )
+            for row in cur.fetchall():
+                categories[row[0]] = Category(*row)
 
     def insert(self, expense: Expense) -> int:
-        self._cur.execute(
-            f"INSERT INTO expenses(AMOUNT, COMMENT, CATEGORY_ID, USER_ID, GROUP_ID) VALUES \
-        ({expense.amount}, '{expense.comment.strip()}', {expense.category.id}, {expense.user.id}, {expense.group.id})"
-        )
-        self._conn.commit()
-        return self._cur.lastrowid or -1
+        return self.insert_many([expense])[0]
+
+    def insert_many(self, expenses: list[Expense]) -> list[int]:
+        with self._connections.write() as cur:
+            cur.executemany(
+                "INSERT INTO expenses(AMOUNT, COMMENT, CATEGORY_ID, USER_ID, GROUP_ID) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        expense.amount,
+                        expense.comment.strip(),
+                        expense.category.id,
+                        expense.user.id,
+                        expense.group.id,
+                    )
+                    for expense in expenses
+                ],
+            )
+            # ID is a rowid alias without AUTOINCREMENT, rows inserted in one
+            # transaction get consecutive ids ending with the current maximum
+            cur.execute("SELECT max(ID) FROM expenses")
+            last = cur.fetchone()[0] or 0
+            ids = list(range(last - len(expenses) + 1, last + 1))
+            self._update_rollup(cur, ids, 1)
+        return ids
 
     def get_expenses_total(
         self, request: ReportRequest
     ) -> dict[Category, list[Expense]]:
-        self._cur.execute(
-            f"SELECT sum(AMOUNT) as AMOUNT, c.id, c.CATEGORY, e.user_id, e.group_id FROM expenses e \
-              LEFT JOIN categories c on e.CATEGORY_ID = c.id \
-              WHERE created_at >= '{request.start}' and e.GROUP_ID = {request.group.id} \
-              GROUP BY c.id, c.CATEGORY, e.user_id, e.group_id \
-              ORDER BY {request.ordering}"
-        )
+        with self._connections.read() as cur:
+            cur.execute(
+                "SELECT sum(AMOUNT) as AMOUNT, c.id, c.CATEGORY, r.user_id, r.group_id FROM expense_rollup r \
+                  LEFT JOIN categories c on r.CATEGORY_ID = c.id \
+                  WHERE r.GROUP_ID = ? and r.PERIOD >= ? and (? or r.USER_ID = ?) \
+                  GROUP BY c.id, c.CATEGORY, r.user_id, r.group_id \
+                  ORDER BY AMOUNT",
+                (request.group.id, request.start, request.all, request.user.id),
+            )
+            rows = cur.fetchall()
 
         expenses = defaultdict(list)
-        for row in self._cur.fetchall():
+        for row in rows:
             expenses[Category(row[1], row[2])].append(
                 Expense(
                     row[0],
@@ -226,16 +506,20 @@ class SqliteClient(DataBaseClient):
     def get_expenses_month_trend(
         self, request: ReportRequest
     ) -> dict[str, list[Expense]]:
-        self._cur.execute(
-            f"SELECT strftime('%Y-%m-%d',created_at), sum(AMOUNT) as AMOUNT, c.id, c.CATEGORY, e.user_id, e.group_id FROM expenses e \
-              LEFT JOIN categories c on e.CATEGORY_ID = c.id \
-              WHERE e.GROUP_ID = {request.group.id} \
-              GROUP BY strftime('%Y-%m-%d',created_at), c.id, c.CATEGORY, e.user_id, e.group_id \
-              ORDER BY {request.ordering}"
-        )
+        with self._connections.read() as cur:
+            cur.execute(
+                "SELECT r.PERIOD, sum(AMOUNT) as AMOUNT, c.id, c.CATEGORY, r.user_id, r.group_id \
+                  FROM expense_rollup r \
+                  LEFT JOIN categories c on r.CATEGORY_ID = c.id \
+                  WHERE r.GROUP_ID = ? and (? or r.USER_ID = ?) \
+                  GROUP BY r.PERIOD, c.id, c.CATEGORY, r.user_id, r.group_id \
+                  ORDER BY r.PERIOD",
+                (request.group.id, request.all, request.user.id),
+            )
+            rows = cur.fetchall()
 
         expenses: dict[str, list[Expense]] = defaultdict(list)
-        for row in self._cur.fetchall():
+        for row in rows:
             expenses[row[0]].append(
                 Expense(
                     row[1],
@@ -246,16 +530,31 @@ class SqliteClient(DataBaseClient):
             )
         return expenses
 
-    def get_expenses_last(self, request: ReportRequest) -> dict[int, Expense]:
-        self._cur.execute(
-            f"SELECT e.ID, AMOUNT,c.id, c.CATEGORY, e.user_id, e.group_id, COMMENT FROM expenses e \
-              LEFT JOIN categories c on e.CATEGORY_ID = c.id \
-              WHERE created_at >= '{request.start}' and e.GROUP_ID = {request.group.id} \
-              ORDER BY {request.ordering}"
-        )
+    def get_expenses_last(self, request: ReportRequest, limit: int) -> ExpensesPage:
+        ordering = get_ordering(request.ordering)
+        after = ""
+        if request.after:
+            after = f"and ({ordering}) > ({', '.join('?' * len(request.after))})"
+        with self._connections.read() as cur:
+            cur.execute(
+                f"SELECT e.ID, AMOUNT,c.id, c.CATEGORY, e.user_id, e.group_id, COMMENT, {ordering} FROM expenses e \
+                  LEFT JOIN categories c on e.CATEGORY_ID = c.id \
+                  WHERE e.GROUP_ID = ? and e.CREATED_AT >= ? and (? or e.USER_ID = ?) {after} \
+                  ORDER BY {ordering} \
+                  LIMIT ?",
+                (
+                    request.group.id,
+                    request.start,
+                    request.all,
+                    request.user.id,
+                    *request.after,
+                    limit + 1,
+                ),
+            )
+            rows = cur.fetchall()
 
         expenses = {}
-        for row in self._cur.fetchall():
+        for row in rows[:limit]:
             expenses[row[0]] = Expense(
                 row[1],
                 Category(row[2], row[3]),
@@ -263,60 +562,348 @@ class SqliteClient(DataBaseClient):
                 Group(row[5]),
                 row[6],
             )
-        return expenses
+        next_page = tuple(rows[limit - 1][7:]) if len(rows) > limit else ()
+        return ExpensesPage(expenses, next_page)
 
     def del_expense(self, id: int) -> None:
-        self._cur.execute(f"DELETE FROM expenses WHERE ID = {id}")
-        self._conn.commit()
+        self.del_expenses([id])
+
+    def del_expenses(self, ids: list[int]) -> None:
+        # a repeated id must not be counted twice in the rollup
+        ids = list(dict.fromkeys(ids))
+        with self._connections.write() as cur:
+            self._update_rollup(cur, ids, -1)
+            cur.executemany("DELETE FROM expenses WHERE ID = ?", [(id,) for id in ids])
 
     def update_expense_category(
         self, current_category_id: int, new_category: int
     ) -> None:
-        self._cur.execute(
-            f"UPDATE expenses SET CATEGORY_ID = {new_category} WHERE id = {current_category_id}"
-        )
-        self._conn.commit()
+        self.move_expenses([current_category_id], new_category)
+
+    def move_expenses(self, ids: list[int], new_category: int) -> None:
+        # a repeated id must not be counted twice in the rollup
+        ids = list(dict.fromkeys(ids))
+        with self._connections.write() as cur:
+            self._update_rollup(cur, ids, -1)
+            cur.executemany(
+                "UPDATE expenses SET CATEGORY_ID = ? WHERE id = ?",
+                [(new_category, id) for id in ids],
+            )
+            self._update_rollup(cur, ids, 1)
+
+    def rebuild_rollup(self) -> None:
+        with self._connections.write() as cur:
+            cur.execute("DELETE FROM expense_rollup")
+            cur.execute(
+                f"INSERT INTO expense_rollup(GROUP_ID, PERIOD, CATEGORY_ID, USER_ID, AMOUNT, COUNT) \
+                  SELECT GROUP_ID, {PERIOD_START} as PERIOD, CATEGORY_ID, USER_ID, sum(AMOUNT), count(*) \
+                  FROM expenses \
+                  WHERE GROUP_ID IS NOT NULL and CATEGORY_ID IS NOT NULL and USER_ID IS NOT NULL \
+                  GROUP BY GROUP_ID, PERIOD, CATEGORY_ID, USER_ID"
+            )
 
-    def insert_category(self, category: str, group: Group) -> None:
-        self._cur.execute(
-            f"INSERT OR REPLACE INTO categories(CATEGORY, activerecord, GROUP_ID) VALUES ('{category}', 1, {group.id})"
+    @staticmethod
+    def _update_rollup(cur: sqlite3.Cursor, ids: list[int], sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) expenses from their rollup rows, without committing."""
+        cur.executemany(
+            f"INSERT INTO expense_rollup(GROUP_ID, PERIOD, CATEGORY_ID, USER_ID, AMOUNT, COUNT) \
+              SELECT GROUP_ID, {PERIOD_START}, CATEGORY_ID, USER_ID, ? * AMOUNT, ? FROM expenses \
+              WHERE ID = ? and GROUP_ID IS NOT NULL and CATEGORY_ID IS NOT NULL and USER_ID IS NOT NULL \
+              ON CONFLICT(GROUP_ID, PERIOD, CATEGORY_ID, USER_ID) \
+              DO UPDATE SET AMOUNT = AMOUNT + excluded.AMOUNT, COUNT = COUNT + excluded.COUNT",
+            [(sign, sign, id) for id in ids],
         )
-        self._conn.commit()
+        if sign < 0:
+            cur.executemany(
+                f"DELETE FROM expense_rollup \
+                  WHERE COUNT <= 0 and (GROUP_ID, PERIOD, CATEGORY_ID, USER_ID) = \
+                  (SELECT GROUP_ID, {PERIOD_START}, CATEGORY_ID, USER_ID FROM expenses WHERE ID = ?)",
+                [(id,) for id in ids],
+            )
+
+    def insert_category(self, category: str, group: Group) -> int:
+        with self._connections.write() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO categories(CATEGORY, activerecord, GROUP_ID) VALUES (?, 1, ?)",
+                (category, group.id),
+            )
+            return cur.lastrowid or -1
 
     def delete_category(self, category: int, group: Group) -> None:
-        self._cur.execute(
-            f"UPDATE categories SET activerecord = 0 WHERE id = {category} and GROUP_ID = {group.id}"
-        )
-        self._conn.commit()
+        with self._connections.write() as cur:
+            cur.execute(
+                "UPDATE categories SET activerecord = 0 WHERE id = ? and GROUP_ID = ?",
+                (category, group.id),
+            )
 
     def _create_database(self) -> None:
-        with open("src/backend/createdb.sql", "r") as fl:
-            sql = fl.read()
-        self._cur.executescript(sql)
-        self._conn.commit()
+        with self._connections.write() as cur:
+            version = get_schema_version(cur.connection)
+            migrate(cur.connection)
+        if version < ROLLUP_SCHEMA_VERSION:
+            self.rebuild_rollup()
 
     def get_user_groups(self, user_id: int) -> list[Group]:
-        self._cur.execute(
-            f"SELECT ug.GROUP_ID, g.NAME from user_groups ug \
-                LEFT JOIN groups g ON ug.GROUP_ID = g.ID \
-                WHERE USER_ID = {user_id} and g.activerecord = 1"
-        )
-        groups = []
-        for row in self._cur.fetchall():
-            groups.append(Group(*row))
-        return groups
+        with self._connections.read() as cur:
+            cur.execute(
+                "SELECT ug.GROUP_ID, g.NAME from user_groups ug \
+                    LEFT JOIN groups g ON ug.GROUP_ID = g.ID \
+                    WHERE USER_ID = ? and g.activerecord = 1",
+                (user_id,),
+            )
+            return [Group(*row) for row in cur.fetchall()]
 
     def get_user(self, user_id: int) -> User | None:
-        self._cur.execute(
-            f"SELECT user_id, username from users WHERE USER_ID ={user_id} "
-        )
-        data = self._cur.fetchone()
+        with self._connections.read() as cur:
+            cur.execute("SELECT user_id from users WHERE USER_ID = ?", (user_id,))
+            data = cur.fetchone()
         return User(*data) if data else None
 
     def get_group(self, group_id: int) -> Group | None:
-        self._cur.execute(f"SELECT id, name from groups WHERE id = {group_id} ")
-        data = self._cur.fetchone()
+        with self._connections.read() as cur:
+            cur.execute("SELECT id, name from groups WHERE id = ?", (group_id,))
+            data = cur.fetchone()
         return Group(*data) if data else None
 
 
-db_client = SqliteClient()
+class InsertBuffer:
+    """Coalesces concurrent expense inserts into one transaction.
+
+    Inserts are queued and written with one ``insert_many`` call once
+    ``max_rows`` expenses are waiting or ``max_delay`` seconds after the first
+    one was queued. Every caller gets the id of its own row after the commit.
+    """
+
+    def __init__(
+        self,
+        insert_many: Callable[[list[Expense]], Awaitable[list[int]]],
+        max_rows: int,
+        max_delay: float,
+    ) -> None:
+        self._insert_many = insert_many
+        self._max_rows = max_rows
+        self._max_delay = max_delay
+        self._pending: list[tuple[Expense, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._flushes: set[asyncio.Task] = set()
+        self.batches = 0
+        self.rows = 0
+        self.max_batch = 0
+        self.flush_time = 0.0
+        self.max_flush_time = 0.0
+
+    async def insert(self, expense: Expense) -> int:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((expense, future))
+        if len(self._pending) >= self._max_rows:
+            self._flush_pending()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_delay, self._flush_pending)
+        return await future
+
+    async def flush(self) -> None:
+        """Write the queued expenses now and wait for every running flush."""
+        self._flush_pending()
+        await asyncio.gather(*self._flushes)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "max_batch": self.max_batch,
+            "mean_batch": self.rows / self.batches if self.batches else 0,
+            "mean_flush_ms": self.flush_time / self.batches * 1000
+            if self.batches
+            else 0,
+            "max_flush_ms": self.max_flush_time * 1000,
+        }
+
+    def _flush_pending(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._flush(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: list[tuple[Expense, asyncio.Future]]) -> None:
+        start = time.perf_counter()
+        try:
+            ids = await self._insert_many([expense for expense, _ in batch])
+        except Exception:
+            # retry one by one, so a bad expense fails only its own caller
+            for expense, future in batch:
+                try:
+                    id = (await self._insert_many([expense]))[0]
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(id)
+            return
+        for (_, future), id in zip(batch, ids):
+            if not future.done():
+                future.set_result(id)
+        elapsed = time.perf_counter() - start
+        self.batches += 1
+        self.rows += len(batch)
+        self.max_batch = max(self.max_batch, len(batch))
+        self.flush_time += elapsed
+        self.max_flush_time = max(self.max_flush_time, elapsed)
+
+
+class AsyncDataBaseClient:
+    """Awaitable facade over a DataBaseClient.
+
+    Writes are executed one at a time on a dedicated worker thread, reads on
+    a pool of ``readers`` threads, each one with its own read-only connection.
+    The event loop is not blocked while a query runs.
+
+    With ``insert_batch_rows`` above 1 concurrent inserts are grouped by an
+    InsertBuffer and committed together, at most ``insert_batch_delay``
+    seconds after the first one.
+
+    ``db`` may be a factory of the client, called on first use or by ``open``
+    so that importing the module does not touch the database.
+    """
+
+    def __init__(
+        self,
+        db: DataBaseClient | Callable[[], DataBaseClient],
+        readers: int = 4,
+        insert_batch_rows: int = 0,
+        insert_batch_delay: float = 0.02,
+    ) -> None:
+        self._client = db if isinstance(db, DataBaseClient) else None
+        self._factory = db
+        self._client_lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-write")
+        self._readers = ThreadPoolExecutor(
+            max_workers=readers, thread_name_prefix="db-read"
+        )
+        self._insert_buffer: InsertBuffer | None = None
+        if insert_batch_rows > 1:
+            self._insert_buffer = InsertBuffer(
+                self.insert_many, insert_batch_rows, insert_batch_delay
+            )
+
+    @property
+    def _db(self) -> DataBaseClient:
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._factory()  # type: ignore
+        return self._client
+
+    async def open(self) -> None:
+        """Open the database on the writer thread instead of on the first query."""
+        await self._write(lambda: self._db)
+
+    async def _write(self, func: Callable[..., T], *args) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer, partial(func, *args))
+
+    async def _read(self, func: Callable[..., T], *args) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, partial(func, *args))
+
+    async def register_user(self, user_id: int, username: str) -> None:
+        await self._write(self._db.register_user, user_id, username)
+
+    async def is_user_registred(self, user: User) -> bool:
+        return await self._read(self._db.is_user_registred, user)
+
+    async def create_group(self, user_id: int, name: str) -> Group:
+        return await self._write(self._db.create_group, user_id, name)
+
+    async def delete_group(self, group: Group) -> None:
+        await self._write(self._db.delete_group, group)
+
+    async def add_user_to_group(self, group: Group, user: User) -> None:
+        await self._write(self._db.add_user_to_group, group, user)
+
+    async def delete_user_from_group(self, group: Group, user: User) -> None:
+        await self._write(self._db.delete_user_from_group, group, user)
+
+    async def insert(self, expense: Expense) -> int:
+        if self._insert_buffer is not None:
+            return await self._insert_buffer.insert(expense)
+        return await self._write(self._db.insert, expense)
+
+    async def insert_many(self, expenses: list[Expense]) -> list[int]:
+        return await self._write(self._db.insert_many, expenses)
+
+    async def get_expenses_total(
+        self, request: ReportRequest
+    ) -> dict[Category, list[Expense]]:
+        return await self._read(self._db.get_expenses_total, request)
+
+    async def get_expenses_last(
+        self, request: ReportRequest, limit: int
+    ) -> ExpensesPage:
+        return await self._read(self._db.get_expenses_last, request, limit)
+
+    async def get_expenses_month_trend(
+        self, request: ReportRequest
+    ) -> dict[str, list[Expense]]:
+        return await self._read(self._db.get_expenses_month_trend, request)
+
+    async def load_categories(
+        self, categories: dict[int, Category], group: Group
+    ) -> None:
+        await self._read(self._db.load_categories, categories, group)
+
+    async def del_expense(self, id: int) -> None:
+        await self._write(self._db.del_expense, id)
+
+    async def del_expenses(self, ids: list[int]) -> None:
+        await self._write(self._db.del_expenses, ids)
+
+    async def update_expense_category(
+        self, current_category_id: int, new_category: int
+    ) -> None:
+        await self._write(
+            self._db.update_expense_category, current_category_id, new_category
+        )
+
+    async def move_expenses(self, ids: list[int], new_category: int) -> None:
+        await self._write(self._db.move_expenses, ids, new_category)
+
+    async def insert_category(self, category: str, group: Group) -> int:
+        return await self._write(self._db.insert_category, category, group)
+
+    async def delete_category(self, category: int, group: Group) -> None:
+        await self._write(self._db.delete_category, category, group)
+
+    async def rebuild_rollup(self) -> None:
+        await self._write(self._db.rebuild_rollup)
+
+    async def get_user_groups(self, user_id: int) -> list[Group]:
+        return await self._read(self._db.get_user_groups, user_id)
+
+    async def get_user(self, user_id: int) -> User | None:
+        return await self._read(self._db.get_user, user_id)
+
+    async def get_group(self, group_id: int) -> Group | None:
+        return await self._read(self._db.get_group, group_id)
+
+    async def flush(self) -> None:
+        """Commit the inserts still waiting in the insert buffer."""
+        if self._insert_buffer is not None:
+            await self._insert_buffer.flush()
+
+    def insert_stats(self) -> dict[str, float]:
+        return self._insert_buffer.stats() if self._insert_buffer else {}
+
+
+db_client = AsyncDataBaseClient(
+    partial(SqliteClient, profile=CONNECTION_PROFILES[config.db_profile]),
+    config.db_readers,
+    config.insert_batch_rows,
+    config.insert_batch_ms / 1000,
+)
@@ -0,0 +1,6 @@
+-- covers the group/date range filter of the reports and the columns they aggregate
+create index if not exists expenses_group_created on expenses (GROUP_ID, CREATED_AT, CATEGORY_ID, USER_ID, AMOUNT);
+
+create index if not exists categories_group on categories (GROUP_ID, activerecord);
+
+-- user_groups lookups by USER_ID are served by the UNIQUE(USER_ID, GROUP_ID) index
@@ -0,0 +1,3 @@
+-- sum and count of expenses per billing period, filled by SqliteClient.rebuild_rollup
+-- and kept up to date by the expense writes
+create table if not exists expense_rollup (GROUP_ID INTEGER NOT NULL, PERIOD TEXT NOT NULL, CATEGORY_ID INTEGER NOT NULL, USER_ID INTEGER NOT NULL, AMOUNT INTEGER NOT NULL DEFAULT 0, COUNT INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (GROUP_ID, PERIOD, CATEGORY_ID, USER_ID)) WITHOUT ROWID;
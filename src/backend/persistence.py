@@ -0,0 +1,244 @@
+"""Bot persistence stored as one sqlite row per user, chat and conversation."""
+import asyncio
+import hashlib
+import io
+import json
+import pathlib
+import pickle
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+# the pickler of PicklePersistence replaces the bot instance inside telegram
+# objects, using it keeps the rows readable by both persistence classes
+# private api, python-telegram-bot is pinned in requirements.txt for it
+from telegram.ext._picklepersistence import _BotPickler, _BotUnpickler
+
+from backend.db import CONNECTION_PROFILES, ConnectionProfile
+
+T = TypeVar("T")
+
+SCHEMA = """
+create table if not exists user_data (ID INTEGER PRIMARY KEY, DATA BLOB NOT NULL);
+create table if not exists chat_data (ID INTEGER PRIMARY KEY, DATA BLOB NOT NULL);
+create table if not exists bot_data (ID INTEGER PRIMARY KEY CHECK (ID = 0), DATA BLOB NOT NULL);
+create table if not exists callback_data (ID INTEGER PRIMARY KEY CHECK (ID = 0), DATA BLOB NOT NULL);
+create table if not exists conversations (
+    NAME TEXT NOT NULL, KEY TEXT NOT NULL, STATE BLOB NOT NULL, PRIMARY KEY (NAME, KEY)
+) WITHOUT ROWID;
+"""
+# tables with one row per id, bot_data and callback_data only use id 0
+DATA_TABLES = ("user_data", "chat_data", "bot_data", "callback_data")
+
+
+class SqlitePersistence(BasePersistence):
+    """Persistence writing only the users, chats and conversations that changed.
+
+    Every user, chat and conversation key is a row holding its pickled data.
+    A row is rewritten only when its pickle differs from the last one written,
+    so saving costs O(changed users), not O(all users) like the single file of
+    PicklePersistence. State left by PicklePersistence in ``pickle_path`` is
+    imported on the first start and the file is renamed to ``*.imported``.
+    """
+
+    def __init__(
+        self,
+        path: str | pathlib.Path = "persistence.db",
+        pickle_path: str | pathlib.Path | None = None,
+        profile: ConnectionProfile = CONNECTION_PROFILES["wal"],
+        store_data: PersistenceInput | None = None,
+        update_interval: float = 60,
+        load_user_data: Callable[[Any], Any] | None = None,
+    ) -> None:
+        super().__init__(
+            store_data=store_data or PersistenceInput(), update_interval=update_interval
+        )
+        self._path = path
+        self._pickle_path = pathlib.Path(pickle_path) if pickle_path else None
+        self._profile = profile
+        # converts user data saved in an older shape when it is loaded
+        self._load_user_data = load_user_data
+        self._conn: sqlite3.Connection | None = None
+        # digests of the pickles in the database, to skip unchanged rows
+        self._digests: dict[tuple, bytes] = {}
+        self._executor: ThreadPoolExecutor | None = None
+
+    async def get_user_data(self) -> dict[int, Any]:
+        user_data = await self._run(self._load_table, "user_data")
+        if self._load_user_data is None:
+            return user_data
+        return {id: self._load_user_data(data) for id, data in user_data.items()}
+
+    async def get_chat_data(self) -> dict[int, Any]:
+        return await self._run(self._load_table, "chat_data")
+
+    async def get_bot_data(self) -> Any:
+        return (await self._run(self._load_table, "bot_data")).get(0, {})
+
+    async def get_callback_data(self) -> Any:
+        return (await self._run(self._load_table, "callback_data")).get(0)
+
+    async def get_conversations(self, name: str) -> dict[tuple, object]:
+        return await self._run(self._load_conversations, name)
+
+    async def update_conversation(
+        self, name: str, key: tuple, new_state: object | None
+    ) -> None:
+        await self._run(self._write_conversation, name, key, new_state)
+
+    async def update_user_data(self, user_id: int, data: Any) -> None:
+        await self._run(self._write_row, "user_data", user_id, data)
+
+    async def update_chat_data(self, chat_id: int, data: Any) -> None:
+        await self._run(self._write_row, "chat_data", chat_id, data)
+
+    async def update_bot_data(self, data: Any) -> None:
+        await self._run(self._write_row, "bot_data", 0, data)
+
+    async def update_callback_data(self, data: Any) -> None:
+        await self._run(self._write_row, "callback_data", 0, data)
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        await self._run(self._delete_row, "chat_data", chat_id)
+
+    async def drop_user_data(self, user_id: int) -> None:
+        await self._run(self._delete_row, "user_data", user_id)
+
+    async def refresh_user_data(self, user_id: int, user_data: Any) -> None:
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: Any) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data: Any) -> None:
+        pass
+
+    async def flush(self) -> None:
+        await self._run(self._close)
+        # flushed when the application shuts down, its last job is done so the
+        # thread ends at once, the next call starts a new one
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="persistence"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args))
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self._path, check_same_thread=False)
+            self._profile.apply(self._conn)
+            self._conn.executescript(SCHEMA)
+            if self._pickle_path is not None and self._pickle_path.exists():
+                self._import_pickle(self._pickle_path)
+        return self._conn
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _dumps(self, data: object) -> bytes:
+        with io.BytesIO() as file:
+            _BotPickler(self.bot, file, protocol=pickle.HIGHEST_PROTOCOL).dump(data)
+            return file.getvalue()
+
+    def _loads(self, blob: bytes) -> Any:
+        with io.BytesIO(blob) as file:
+            return _BotUnpickler(self.bot, file).load()
+
+    def _load_table(self, table: str) -> dict[int, Any]:
+        rows = self._connect().execute(f"SELECT ID, DATA FROM {table}").fetchall()
+        for id, blob in rows:
+            self._digests[(table, id)] = _digest(blob)
+        return {id: self._loads(blob) for id, blob in rows}
+
+    def _load_conversations(self, name: str) -> dict[tuple, object]:
+        rows = (
+            self._connect()
+            .execute("SELECT KEY, STATE FROM conversations WHERE NAME = ?", (name,))
+            .fetchall()
+        )
+        conversations = {}
+        for key, blob in rows:
+            self._digests[("conversations", name, key)] = _digest(blob)
+            conversations[tuple(json.loads(key))] = self._loads(blob)
+        return conversations
+
+    def _write_row(self, table: str, id: int, data: object) -> None:
+        blob = self._dumps(data)
+        digest = _digest(blob)
+        if self._digests.get((table, id)) == digest:
+            return
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {table}(ID, DATA) VALUES(?, ?)", (id, blob)
+            )
+        self._digests[(table, id)] = digest
+
+    def _delete_row(self, table: str, id: int) -> None:
+        with self._connect() as conn:
+            conn.execute(f"DELETE FROM {table} WHERE ID = ?", (id,))
+        self._digests.pop((table, id), None)
+
+    def _write_conversation(self, name: str, key: tuple, state: object) -> None:
+        json_key = json.dumps(list(key))
+        digest_key = ("conversations", name, json_key)
+        with self._connect() as conn:
+            if state is None:
+                conn.execute(
+                    "DELETE FROM conversations WHERE NAME = ? and KEY = ?",
+                    (name, json_key),
+                )
+                self._digests.pop(digest_key, None)
+                return
+            blob = self._dumps(state)
+            digest = _digest(blob)
+            if self._digests.get(digest_key) == digest:
+                return
+            conn.execute(
+                "INSERT OR REPLACE INTO conversations(NAME, KEY, STATE) VALUES(?, ?, ?)",
+                (name, json_key, blob),
+            )
+            self._digests[digest_key] = digest
+
+    def _import_pickle(self, path: pathlib.Path) -> None:
+        """Copy the state of a PicklePersistence single file into the tables."""
+        with path.open("rb") as file:
+            data = _BotUnpickler(self.bot, file).load()
+        rows = {
+            "user_data": data.get("user_data") or {},
+            "chat_data": data.get("chat_data") or {},
+            "bot_data": {0: data["bot_data"]} if data.get("bot_data") else {},
+            "callback_data": {0: data["callback_data"]}
+            if data.get("callback_data")
+            else {},
+        }
+        with self._conn as conn:  # type: ignore
+            for table in DATA_TABLES:
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO {table}(ID, DATA) VALUES(?, ?)",
+                    [(id, self._dumps(value)) for id, value in rows[table].items()],
+                )
+            conn.executemany(
+                "INSERT OR REPLACE INTO conversations(NAME, KEY, STATE) VALUES(?, ?, ?)",
+                [
+                    (name, json.dumps(list(key)), self._dumps(state))
+                    for name, states in (data.get("conversations") or {}).items()
+                    for key, state in states.items()
+                    if state is not None
+                ],
+            )
+        path.rename(path.with_name(f"{path.name}.imported"))
+
+
+def _digest(blob: bytes) -> bytes:
+    return hashlib.blake2b(blob, digest_size=16).digest()
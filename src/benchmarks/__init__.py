@@ -0,0 +1,4 @@
+import os
+
+# config refuses to import without a token, benchmarks never talk to telegram
+os.environ.setdefault("bot_token", "benchmark")
@@ -0,0 +1,75 @@
+"""Deleting and moving several expenses one by one against a single transaction.
+
+Every per-expense call commits on its own, so the per-expense numbers include
+one fsync each; the bulk calls commit once for the whole batch.
+
+Run from ``src``: ``python -m benchmarks.bulk --batch 20``
+"""
+import argparse
+
+from backend.db import Category, Expense, Group, User
+from benchmarks.common import Dataset, measure, report, scratch_client
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with scratch_client(Dataset(rows=args.rows)) as client:
+
+        def expenses() -> list[Expense]:
+            return [
+                Expense(i, Category(1 + i % 10), User(1 + i % 20), Group(1), "")
+                for i in range(args.batch)
+            ]
+
+        def insert_each() -> list[int]:
+            return [client.insert(expense) for expense in expenses()]
+
+        report(
+            "insert one by one",
+            measure(insert_each, args.repeat),
+        )
+        report(
+            "insert_many",
+            measure(lambda: client.insert_many(expenses()), args.repeat),
+        )
+
+        def move_each() -> None:
+            for id in insert_each():
+                client.update_expense_category(id, 2)
+
+        report(
+            "insert + move one by one",
+            measure(move_each, args.repeat),
+        )
+        report(
+            "insert_many + move_expenses",
+            measure(
+                lambda: client.move_expenses(client.insert_many(expenses()), 2),
+                args.repeat,
+            ),
+        )
+
+        def del_each() -> None:
+            for id in insert_each():
+                client.del_expense(id)
+
+        report(
+            "insert + delete one by one",
+            measure(del_each, args.repeat),
+        )
+        report(
+            "insert_many + del_expenses",
+            measure(
+                lambda: client.del_expenses(client.insert_many(expenses())),
+                args.repeat,
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Render time and size of the report charts for every render profile.
+
+Run from ``src``: ``python -m benchmarks.charts``
+"""
+import argparse
+import random
+
+from benchmarks.common import measure
+from reports.charts import generate_chart, generate_trend_chart
+from reports.profiles import PROFILES
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--categories", type=int, default=10)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    labels = [f"category{i}" for i in range(args.categories)]
+    total = {label: round(rnd.uniform(1, 50), 1) for label in labels}
+    months = [str(month % 12 + 1) for month in range(args.months)]
+    series = [
+        [round(rnd.uniform(0, 20), 1) for _ in months] for _ in range(args.categories)
+    ]
+
+    print(f"{'chart':<8} {'profile':<12} {'p50 ms':>8} {'max ms':>8} {'KB':>8}")
+    for name, profile in PROFILES.items():
+        for chart, render in [
+            ("total", lambda: generate_chart(total, profile)),
+            ("trend", lambda: generate_trend_chart(labels, series, months, profile)),
+        ]:
+            timings = sorted(measure(render, args.repeat))
+            size = len(render()) / 1024
+            print(
+                f"{chart:<8} {name:<12} {timings[len(timings) // 2] * 1000:8.1f} "
+                f"{timings[-1] * 1000:8.1f} {size:8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Callable, Iterator
+
+from telegram.request import BaseRequest, RequestData
+
+if TYPE_CHECKING:
+    from backend.db import ConnectionProfile, SqliteClient
+
+
+@dataclass(frozen=True)
+class Dataset:
+    rows: int = 100_000
+    users: int = 20
+    groups: int = 5
+    categories: int = 10
+    years: int = 3
+
+
+def populate(conn: sqlite3.Connection, dataset: Dataset, seed: int = 0) -> None:
+    """Fill a migrated database with random users, groups, categories and expenses."""
+    rnd = random.Random(seed)
+    conn.executemany(
+        "INSERT OR IGNORE INTO users(USER_ID, USERNAME) VALUES(?, ?)",
+        [(user, f"user{user}") for user in range(1, dataset.users + 1)],
+    )
+    conn.executemany(
+        "INSERT INTO groups(ID, NAME, CREATOR) VALUES(?, ?, 1)",
+        [(group, f"group{group}") for group in range(1, dataset.groups + 1)],
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO user_groups(USER_ID, GROUP_ID) VALUES(?, ?)",
+        [
+            (user, group)
+            for user in range(1, dataset.users + 1)
+            for group in range(1, dataset.groups + 1)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO categories(CATEGORY, GROUP_ID) VALUES(?, ?)",
+        [
+            (f"category{category}", group)
+            for group in range(1, dataset.groups + 1)
+            for category in range(dataset.categories)
+        ],
+    )
+    now = datetime.utcnow()
+    span = int(timedelta(days=365 * dataset.years).total_seconds())
+
+    def expenses():
+        for _ in range(dataset.rows):
+            group = rnd.randint(1, dataset.groups)
+            created_at = now - timedelta(seconds=rnd.randrange(span))
+            yield (
+                created_at.strftime("%Y-%m-%d %H:%M:%S"),
+                rnd.randint(100, 20_000),
+                "",
+                (group - 1) * dataset.categories + rnd.randint(1, dataset.categories),
+                group,
+                rnd.randint(1, dataset.users),
+            )
+
+    conn.executemany(
+        "INSERT INTO expenses(CREATED_AT, AMOUNT, COMMENT, CATEGORY_ID, GROUP_ID, USER_ID) \
+        VALUES(?, ?, ?, ?, ?, ?)",
+        expenses(),
+    )
+    conn.commit()
+
+
+@contextmanager
+def scratch_client(
+    dataset: Dataset,
+    profile: "ConnectionProfile | None" = None,
+    chdir: bool = False,
+) -> Iterator["SqliteClient"]:
+    """Client of a new database filled with ``dataset``, in a temporary directory.
+
+    With ``chdir`` the directory is the working one meanwhile, so the bot modules
+    imported inside keep their database, chart cache and logs in it.
+    """
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        if chdir:
+            os.chdir(tmp)
+        try:
+            # imported here, the backend creates the logs in the working directory
+            from backend.db import CONNECTION_PROFILES, SqliteClient
+
+            client = SqliteClient(
+                os.path.join(tmp, "expenses.db"), profile or CONNECTION_PROFILES["wal"]
+            )
+            with sqlite3.connect(client.path) as conn:
+                populate(conn, dataset)
+            client.rebuild_rollup()
+            try:
+                yield client
+            finally:
+                client.close()
+        finally:
+            os.chdir(cwd)
+
+
+def measure(func: Callable[[], object], repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(name: str, timings: list[float]) -> None:
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(
+        f"{name:<40} n={len(timings):<5} "
+        f"p50={statistics.median(timings) * 1000:9.2f}ms "
+        f"p95={p95 * 1000:9.2f}ms "
+        f"p99={p99 * 1000:9.2f}ms "
+        f"max={timings[-1] * 1000:9.2f}ms"
+    )
+
+
+class TelegramStub(BaseRequest):
+    """Telegram bot API answering every call after ``latency`` seconds.
+
+    Sent messages are echoed back as messages of the bot, other calls succeed.
+    ``calls`` counts the calls by api method.
+    """
+
+    BOT = {"id": 1, "is_bot": True, "first_name": "bot", "username": "benchmark_bot"}
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self._latency = latency
+        self._message_ids = 0
+        self.calls: Counter[str] = Counter()
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def do_request(
+        self, url: str, method: str, request_data: RequestData | None = None, **kwargs
+    ) -> tuple[int, bytes]:
+        api_method = url.rsplit("/", 1)[-1]
+        self.calls[api_method] += 1
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        parameters = request_data.parameters if request_data else {}
+        result: object = True
+        if api_method == "getMe":
+            result = self.BOT
+        elif api_method == "getUpdates":
+            result = []
+        elif api_method.startswith("send"):
+            self._message_ids += 1
+            result = {
+                "message_id": self._message_ids,
+                "date": int(time.time()),
+                "chat": {"id": int(parameters.get("chat_id", 0)), "type": "private"},
+                "from": self.BOT,
+                "text": parameters.get("text", ""),
+            }
+        return 200, json.dumps({"ok": True, "result": result}).encode()
+
+
+def text_update(update_id: int, user_id: int, text: str) -> dict:
+    """Telegram update of a private text message, a command when it starts with /."""
+    entities = []
+    if text.startswith("/"):
+        entities.append(
+            {"type": "bot_command", "offset": 0, "length": len(text.split()[0])}
+        )
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"},
+            "text": text,
+            "entities": entities,
+        },
+    }
+
+
+def callback_update(update_id: int, user_id: int, data: str) -> dict:
+    """Telegram update of an inline button with ``data`` pressed in a private chat."""
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"},
+            "chat_instance": str(user_id),
+            "data": data,
+            "message": {
+                "message_id": update_id,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "text": "",
+            },
+        },
+    }
@@ -0,0 +1,77 @@
+"""Insert latency while reports are read concurrently, per connection profile.
+
+A reader thread keeps listing every expense of a group, through its own read
+connection, while the main thread inserts expenses through the writer. With the rollback
+journal a commit has to wait for the running read to finish, with the
+write-ahead log it does not.
+
+Run from ``src``: ``python -m benchmarks.concurrency --rows 200000``
+"""
+import argparse
+import threading
+import time
+
+import constants.callbacks as cb
+from backend.db import (
+    CONNECTION_PROFILES,
+    Category,
+    ConnectionProfile,
+    Expense,
+    Group,
+    ReportRequest,
+    User,
+)
+from benchmarks.common import Dataset, measure, report, scratch_client
+
+
+def run(profile_name: str, profile: ConnectionProfile, args) -> None:
+    with scratch_client(Dataset(rows=args.rows), profile) as client:
+
+        request = ReportRequest(
+            User(1), Group(1), cb.report_by_date, "2000-01-01", all=True
+        )
+        stop = threading.Event()
+        reads = 0
+
+        def read() -> None:
+            nonlocal reads
+            while not stop.is_set():
+                client.get_expenses_last(request, args.rows)
+                reads += 1
+
+        def insert() -> None:
+            client.insert(Expense(100, Category(1), User(1), Group(1), ""))
+
+        def inserts() -> list[float]:
+            timings = []
+            for _ in range(args.inserts):
+                timings += measure(insert, 1)
+                # spread the inserts over several report reads
+                time.sleep(args.interval / 1000)
+            return timings
+
+        report(f"{profile_name}: insert, idle", inserts())
+        thread = threading.Thread(target=read)
+        thread.start()
+        try:
+            timings = inserts()
+        finally:
+            stop.set()
+            thread.join()
+        report(f"{profile_name}: insert, reports running", timings)
+        print(f"{profile_name}: {reads} reports read meanwhile")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--inserts", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=10, help="ms between inserts")
+    args = parser.parse_args()
+
+    for name, profile in CONNECTION_PROFILES.items():
+        run(name, profile, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""Latency and throughput of the bot handlers against a synthetic database.
+
+The handlers are called directly with telegram updates built from json and
+the context of the application of ``bot.py``, whose bot talks to a
+TelegramStub. The database is filled with ``--rows`` expenses of ``--users``
+users in ``--groups`` groups over ``--years`` years, in a temporary directory.
+
+The report cache is cleared before every request, so reports follow the cost
+of the queries and of the formatting, ``--cached`` keeps it. Charts stay
+cached on disk, only the first chart of every user is rendered by the chart
+workers. ``--concurrency`` users send their requests at the same time.
+
+Run from ``src``: ``python -m benchmarks.handlers --rows 1000000``
+"""
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from telegram import Update
+from telegram.ext import Application, CallbackContext
+
+from benchmarks.common import (
+    Dataset,
+    TelegramStub,
+    callback_update,
+    report,
+    scratch_client,
+    text_update,
+)
+
+# the bot modules are imported once the working directory is the temporary
+# one, the database, chart cache and logs of the bot are relative to it
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    handler: Callable[..., Awaitable[object]]
+    # update json of an update id and a user id
+    update: Callable[[int, int], dict]
+    # report function of the session
+    func: str | None = None
+    # the session holds the ids of a listed page of expenses
+    expense_ids: bool = False
+
+
+def scenarios() -> list[Scenario]:
+    import constants.callbacks as cb
+    from expenses.conversation_add_expense import insert_expense
+    from expenses.conversation_manage_expense import (
+        delete_expense,
+        delete_expense_request,
+        move_expense,
+    )
+    from reports.conversation import send_group_for_report_menu, send_report
+
+    return [
+        Scenario(
+            "send_groups",
+            send_group_for_report_menu,
+            lambda i, user: text_update(i, user, "/reports"),
+        ),
+        Scenario(
+            "insert_expense",
+            insert_expense,
+            lambda i, user: text_update(i, user, f"{100 + i} lunch"),
+        ),
+        Scenario(
+            "send_report list",
+            send_report,
+            lambda i, user: callback_update(i, user, cb.report_by_date),
+            cb.report_list,
+        ),
+        Scenario(
+            "send_report total",
+            send_report,
+            lambda i, user: callback_update(i, user, "1"),
+            cb.report_total,
+        ),
+        Scenario(
+            "send_report trend",
+            send_report,
+            lambda i, user: callback_update(i, user, "1"),
+            cb.report_trend,
+        ),
+        Scenario(
+            "expense list with ids",
+            delete_expense_request,
+            lambda i, user: callback_update(i, user, cb.manage_delete_expense),
+        ),
+        Scenario(
+            "move_expense",
+            move_expense,
+            lambda i, user: text_update(i, user, "1,2,3"),
+            expense_ids=True,
+        ),
+        Scenario(
+            "delete_expense",
+            delete_expense,
+            lambda i, user: text_update(i, user, "1"),
+            expense_ids=True,
+        ),
+    ]
+
+
+class Bench:
+    def __init__(self, application: Application, dataset: Dataset, args) -> None:
+        self._application = application
+        self._dataset = dataset
+        self._args = args
+        self._update_id = 0
+
+    async def prepare(self, scenario: Scenario, user_id: int) -> None:
+        """Put the session of the user in the state the handler is called in."""
+        import constants.callbacks as cb
+        from backend.db import Group, ReportRequest, User, db_client
+        from config import PAGE_SIZE
+        from reports.cache import report_cache
+
+        group_id = 1 + user_id % self._dataset.groups
+        session = self._application.user_data[user_id]
+        session.group_id = group_id
+        session.category_id = (group_id - 1) * self._dataset.categories + 1
+        session.func = scenario.func
+        session.all = False
+        if scenario.expense_ids:
+            page = await db_client.get_expenses_last(
+                ReportRequest(User(user_id), Group(group_id), cb.report_by_date),
+                PAGE_SIZE,
+            )
+            session.expense_ids = tuple(page.expenses)
+        if not self._args.cached:
+            report_cache.invalidate(Group(group_id))
+
+    async def request(self, scenario: Scenario, user_id: int) -> float:
+        await self.prepare(scenario, user_id)
+        self._update_id += 1
+        update = Update.de_json(
+            scenario.update(self._update_id, user_id), self._application.bot
+        )
+        context = CallbackContext.from_update(update, self._application)
+        start = time.perf_counter()
+        await scenario.handler(update, context)
+        return time.perf_counter() - start
+
+    async def run(self, scenario: Scenario) -> None:
+        # renders the charts and loads the categories outside of the timings
+        await self.request(scenario, 1)
+
+        timings: list[float] = []
+        concurrency = min(self._args.concurrency, self._dataset.users)
+
+        async def user_requests(task: int) -> None:
+            # every task sends the requests of its own users, one at a time
+            users = range(1 + task, self._dataset.users + 1, concurrency)
+            for n in range(task, self._args.requests, concurrency):
+                user_id = users[n // concurrency % len(users)]
+                timings.append(await self.request(scenario, user_id))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(user_requests(task) for task in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        report(scenario.name, timings)
+        print(f"{scenario.name:<40} {len(timings) / elapsed:12.0f} requests/s")
+
+
+async def run(dataset: Dataset, args) -> None:
+    import bot
+
+    stub = TelegramStub(args.api_latency_ms / 1000)
+    application = bot.build_application(stub)
+    await application.initialize()
+    await application.post_init(application)
+    bench = Bench(application, dataset, args)
+    try:
+        for scenario in scenarios():
+            if args.only and scenario.name not in args.only:
+                continue
+            await bench.run(scenario)
+    finally:
+        await application.shutdown()
+        await application.post_shutdown(application)
+    print(f"{'telegram api calls':<40} {dict(stub.calls)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--groups", type=int, default=5)
+    parser.add_argument("--categories", type=int, default=10)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--api-latency-ms", type=int, default=0)
+    parser.add_argument("--cached", action="store_true")
+    parser.add_argument("--only", nargs="*", help="names of the scenarios to run")
+    args = parser.parse_args()
+    dataset = Dataset(args.rows, args.users, args.groups, args.categories, args.years)
+
+    # the bot opens the expenses.db of the working directory
+    with scratch_client(dataset, chdir=True):
+        asyncio.run(run(dataset, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Import time of the bot module, from ``python -X importtime``.
+
+Imports ``--module`` in fresh interpreters and reports the wall time, the
+slowest modules by cumulative import time and which of the chart libraries
+were loaded. None of them should be, they are imported by the chart workers.
+
+Run from ``src``: ``python -m benchmarks.importtime``
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import report
+
+HEAVY_MODULES = ("numpy", "matplotlib", "PIL")
+
+
+def import_module(module: str, cwd: str, importtime: bool = False) -> str:
+    """Chart libraries loaded by an interpreter importing ``module``, then its stderr."""
+    src = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "PYTHONPATH": src, "bot_token": "123:abc"}
+    args = [sys.executable, *(["-X", "importtime"] if importtime else [])]
+    check = (
+        f"import sys, {module}; print([m for m in {HEAVY_MODULES} if m in sys.modules])"
+    )
+    result = subprocess.run(
+        [*args, "-c", check],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.strip() + "\n" + result.stderr
+
+
+def slowest(stderr: str, top: int) -> list[tuple[int, str]]:
+    """Modules of an importtime report with the largest cumulative time, in us."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        modules.append((int(cumulative), name.strip()))
+    return sorted(modules, reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="bot")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    # a scratch directory, so no database or chart cache of the bot is touched
+    with tempfile.TemporaryDirectory() as tmp:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            output = import_module(args.module, tmp)
+            timings.append(time.perf_counter() - start)
+        report(f"python -c 'import {args.module}'", timings)
+        print(f"{'chart libraries imported':<40} {output.splitlines()[0]}")
+        print(f"{'files created':<40} {sorted(os.listdir(tmp))}")
+
+        for cumulative, name in slowest(
+            import_module(args.module, tmp, True), args.top
+        ):
+            print(f"{name:<40} {cumulative / 1000:9.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
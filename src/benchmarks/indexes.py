@@ -0,0 +1,95 @@
+"""Report query latency with and without the report indexes.
+
+The total and trend reports read the expense rollup, the index serves the
+same aggregations over the expenses table, which the rollup rebuild runs, so
+those are timed on the expenses table. Listing the last expenses still reads
+it directly.
+
+Run from ``src``: ``python -m benchmarks.indexes --rows 1000000``
+"""
+import argparse
+import sqlite3
+
+import constants.callbacks as cb
+from backend.db import (
+    PERIOD_START,
+    Group,
+    ReportRequest,
+    SqliteClient,
+    User,
+    period_calendar,
+)
+from benchmarks.common import Dataset, measure, report, scratch_client
+from config import PAGE_SIZE
+
+INDEXES = ["expenses_group_created", "categories_group"]
+
+
+def expenses_total(conn: sqlite3.Connection, request: ReportRequest) -> None:
+    conn.execute(
+        "SELECT sum(AMOUNT), CATEGORY_ID, USER_ID FROM expenses \
+          WHERE GROUP_ID = ? and CREATED_AT >= ? \
+          GROUP BY CATEGORY_ID, USER_ID",
+        (request.group.id, request.start),
+    ).fetchall()
+
+
+def expenses_month_trend(conn: sqlite3.Connection, request: ReportRequest) -> None:
+    conn.execute(
+        f"SELECT {PERIOD_START} as PERIOD, sum(AMOUNT), CATEGORY_ID, USER_ID FROM expenses \
+          WHERE GROUP_ID = ? \
+          GROUP BY PERIOD, CATEGORY_ID, USER_ID",
+        (request.group.id,),
+    ).fetchall()
+
+
+def run_reports(client: SqliteClient, label: str, repeat: int) -> None:
+    request = ReportRequest(
+        User(1), Group(1), cb.report_by_date, period_calendar.current()
+    )
+    conn = sqlite3.connect(client.path)
+    report(
+        f"{label} total",
+        measure(lambda: expenses_total(conn, request), repeat),
+    )
+    report(
+        f"{label} last",
+        measure(lambda: client.get_expenses_last(request, PAGE_SIZE), repeat),
+    )
+    report(
+        f"{label} month trend",
+        measure(lambda: expenses_month_trend(conn, request), repeat),
+    )
+    report(
+        f"{label} user groups",
+        measure(lambda: client.get_user_groups(1), repeat),
+    )
+    conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with scratch_client(Dataset(rows=args.rows)) as client:
+        path = client.path
+        with sqlite3.connect(path) as conn:
+            conn.execute("ANALYZE")
+
+        run_reports(client, "indexed", args.repeat)
+
+        with sqlite3.connect(path) as conn:
+            for index in INDEXES:
+                conn.execute(f"DROP INDEX {index}")
+            conn.execute("ANALYZE")
+        client = SqliteClient(path)
+        try:
+            run_reports(client, "no index", args.repeat)
+        finally:
+            client.close()
+
+
+if __name__ == "__main__":
+    main()
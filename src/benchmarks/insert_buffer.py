@@ -0,0 +1,76 @@
+"""Concurrent expense inserts committed one by one against the insert buffer.
+
+``--users`` tasks insert expenses at the same time, as in a month-end burst,
+through an AsyncDataBaseClient with and without the insert buffer. The gain
+depends on the cost of a commit: large with the fsync of every commit of the
+rollback journal, small with the write-ahead log and ``synchronous=NORMAL``.
+
+Run from ``src``: ``python -m benchmarks.insert_buffer --profile rollback``
+"""
+import argparse
+import asyncio
+import time
+
+from backend.db import (
+    CONNECTION_PROFILES,
+    AsyncDataBaseClient,
+    Category,
+    Expense,
+    Group,
+    User,
+)
+from benchmarks.common import Dataset, report, scratch_client
+
+
+async def burst(client: AsyncDataBaseClient, users: int, inserts: int) -> list[float]:
+    timings: list[float] = []
+
+    async def user(user_id: int) -> None:
+        for i in range(inserts):
+            expense = Expense(
+                100 + i, Category(1 + i % 10), User(user_id), Group(1 + user_id % 5)
+            )
+            start = time.perf_counter()
+            await client.insert(expense)
+            timings.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(user(user_id) for user_id in range(1, users + 1)))
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--inserts", type=int, default=20)
+    parser.add_argument("--batch-rows", type=int, default=100)
+    parser.add_argument("--batch-ms", type=int, default=20)
+    parser.add_argument("--profile", choices=CONNECTION_PROFILES, default="wal")
+    args = parser.parse_args()
+
+    with scratch_client(
+        Dataset(rows=args.rows), CONNECTION_PROFILES[args.profile]
+    ) as db:
+
+        for name, client in (
+            ("insert per commit", AsyncDataBaseClient(db)),
+            (
+                "insert buffer",
+                AsyncDataBaseClient(
+                    db,
+                    insert_batch_rows=args.batch_rows,
+                    insert_batch_delay=args.batch_ms / 1000,
+                ),
+            ),
+        ):
+            start = time.perf_counter()
+            timings = asyncio.run(burst(client, args.users, args.inserts))
+            elapsed = time.perf_counter() - start
+            report(name, timings)
+            print(f"{name:<40} {len(timings) / elapsed:12.0f} inserts/s")
+            if stats := client.insert_stats():
+                print(f"{name:<40} {stats}")
+
+
+if __name__ == "__main__":
+    main()
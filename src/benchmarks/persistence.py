@@ -0,0 +1,88 @@
+"""Cost of saving the state of the changed users, PicklePersistence against SqlitePersistence.
+
+``--users`` users have user data shaped like the bot's: the last sent message
+and the id map of a page of expenses. Every run ``--changed`` of them change
+and are saved, as the application does at each persistence interval.
+
+Run from ``src``: ``python -m benchmarks.persistence --users 2000``
+"""
+import argparse
+import asyncio
+import pickle
+import tempfile
+from datetime import datetime
+
+from telegram import Chat, Message
+from telegram.ext import BasePersistence, ExtBot, PicklePersistence
+from telegram.ext._picklepersistence import _BotPickler
+
+from backend.persistence import SqlitePersistence
+from benchmarks.common import measure, report
+from config import PAGE_SIZE
+
+
+def user_data(bot: ExtBot, user_id: int) -> dict:
+    message = Message(user_id, datetime.now(), Chat(user_id, "private"), text="x")
+    message.set_bot(bot)
+    return {
+        "msg_id": message,
+        "id_map": {i: user_id * PAGE_SIZE + i for i in range(1, PAGE_SIZE + 1)},
+    }
+
+
+def write_pickle(path: str, bot: ExtBot, users: int) -> None:
+    """State of ``users`` users in the single file format of PicklePersistence."""
+    data = {
+        "user_data": {user_id: user_data(bot, user_id) for user_id in range(users)},
+        "chat_data": {},
+        "bot_data": {},
+        "callback_data": None,
+        "conversations": {},
+    }
+    with open(path, "wb") as file:
+        _BotPickler(bot, file, protocol=pickle.HIGHEST_PROTOCOL).dump(data)
+
+
+def run(name: str, persistence: BasePersistence, bot: ExtBot, args) -> None:
+    loop = asyncio.new_event_loop()
+    persistence.set_bot(bot)
+    data = loop.run_until_complete(persistence.get_user_data())
+    changed = 0
+
+    async def update() -> None:
+        nonlocal changed
+        for _ in range(args.changed):
+            user_id = changed % args.users
+            # a copy, like a handler replacing a value of its user data
+            data[user_id] = {**data[user_id], "page": changed}
+            await persistence.update_user_data(user_id, data[user_id])
+            changed += 1
+
+    timings = measure(lambda: loop.run_until_complete(update()), args.repeat)
+    report(f"{name}: save {args.changed} of {args.users} users", timings)
+    loop.run_until_complete(persistence.flush())
+    loop.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--changed", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    bot = ExtBot("123:abc")
+    with tempfile.TemporaryDirectory() as tmp:
+        write_pickle(f"{tmp}/persistance_states", bot, args.users)
+        run("pickle", PicklePersistence(f"{tmp}/persistance_states"), bot, args)
+        # imports the same state from the pickle file
+        run(
+            "sqlite",
+            SqlitePersistence(f"{tmp}/persistence.db", f"{tmp}/persistance_states"),
+            bot,
+            args,
+        )
+
+
+if __name__ == "__main__":
+    main()
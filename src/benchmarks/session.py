@@ -0,0 +1,74 @@
+"""Size and pickling time of the user data of one user, dict against Session.
+
+The dict is shaped like the user data before Session: the last sent Message,
+the group and category dataclasses and the id map of a page of expenses. The
+Session holds the same state as ids.
+
+Run from ``src``: ``python -m benchmarks.session``
+"""
+import argparse
+import io
+import pickle
+from datetime import datetime
+
+from telegram import Chat, Message, User
+from telegram.ext import ExtBot
+from telegram.ext._picklepersistence import _BotPickler
+
+import constants.callbacks as cb
+from backend.db import Category, Group
+from benchmarks.common import measure, report
+from config import PAGE_SIZE
+from constants.userdata import UserData
+from session import Session
+
+
+def legacy_user_data(bot: ExtBot, user_id: int) -> dict:
+    message = Message(
+        user_id,
+        datetime.now(),
+        Chat(user_id, "private"),
+        from_user=User(user_id, "bot", True),
+        text="расход 100 руб добавлен в категорию еда",
+    )
+    message.set_bot(bot)
+    return {
+        UserData.msg_id: message,
+        UserData.group: Group(1),
+        UserData.category: Category(1, "еда"),
+        UserData.id_map: {i: user_id * PAGE_SIZE + i for i in range(1, PAGE_SIZE + 1)},
+        UserData.func: cb.report_list,
+        UserData.all: False,
+        UserData.ordering: cb.report_by_date,
+        UserData.pages: [()],
+        UserData.next_page: ("2023-01-01 00:00:00", user_id),
+    }
+
+
+def dumps(bot: ExtBot, data: object) -> bytes:
+    with io.BytesIO() as file:
+        _BotPickler(bot, file, protocol=pickle.HIGHEST_PROTOCOL).dump(data)
+        return file.getvalue()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    bot = ExtBot("123:abc")
+    legacy = {user_id: legacy_user_data(bot, user_id) for user_id in range(args.users)}
+    sessions = {user_id: Session.from_dict(data) for user_id, data in legacy.items()}
+
+    for name, user_data in (("dict", legacy), ("session", sessions)):
+        size = sum(len(dumps(bot, data)) for data in user_data.values())
+        print(f"{name:<40} {size / args.users:12.0f} bytes/user")
+        timings = measure(
+            lambda: [dumps(bot, data) for data in user_data.values()], args.repeat
+        )
+        report(f"{name}: pickle {args.users} users", timings)
+
+
+if __name__ == "__main__":
+    main()
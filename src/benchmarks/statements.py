@@ -0,0 +1,122 @@
+"""Throughput of bound-parameter statements against inlined f-string SQL.
+
+Inlined values make every statement text unique, so sqlite re-parses and
+re-plans each one instead of reusing the connection statement cache.
+
+Run from ``src``: ``python -m benchmarks.statements --rows 100000``
+"""
+import argparse
+import sqlite3
+import time
+from typing import Callable
+
+import constants.callbacks as cb
+from backend.db import Category, ConnectionProfile, Expense, Group, ReportRequest, User
+from benchmarks.common import Dataset, scratch_client
+
+
+def bound_insert(conn: sqlite3.Connection, expense: Expense) -> None:
+    conn.execute(
+        "INSERT INTO expenses(AMOUNT, COMMENT, CATEGORY_ID, USER_ID, GROUP_ID) VALUES (?, ?, ?, ?, ?)",
+        (
+            expense.amount,
+            expense.comment,
+            expense.category.id,
+            expense.user.id,
+            expense.group.id,
+        ),
+    )
+
+
+def inline_insert(conn: sqlite3.Connection, expense: Expense) -> None:
+    conn.execute(
+        f"INSERT INTO expenses(AMOUNT, COMMENT, CATEGORY_ID, USER_ID, GROUP_ID) VALUES \
+        ({expense.amount}, '{expense.comment}', {expense.category.id}, {expense.user.id}, {expense.group.id})"
+    )
+
+
+def bound_total(conn: sqlite3.Connection, request: ReportRequest) -> None:
+    conn.execute(
+        "SELECT sum(AMOUNT) as AMOUNT, c.id, c.CATEGORY, e.user_id, e.group_id FROM expenses e \
+          LEFT JOIN categories c on e.CATEGORY_ID = c.id \
+          WHERE e.GROUP_ID = ? and e.CREATED_AT >= ? \
+          GROUP BY c.id, c.CATEGORY, e.user_id, e.group_id \
+          ORDER BY AMOUNT",
+        (request.group.id, request.start),
+    ).fetchall()
+
+
+def inline_total(conn: sqlite3.Connection, request: ReportRequest) -> None:
+    conn.execute(
+        f"SELECT sum(AMOUNT) as AMOUNT, c.id, c.CATEGORY, e.user_id, e.group_id FROM expenses e \
+          LEFT JOIN categories c on e.CATEGORY_ID = c.id \
+          WHERE e.GROUP_ID = {request.group.id} and e.CREATED_AT >= '{request.start}' \
+          GROUP BY c.id, c.CATEGORY, e.user_id, e.group_id \
+          ORDER BY AMOUNT"
+    ).fetchall()
+
+
+def per_second(name: str, func: Callable[[int], object], count: int) -> None:
+    start = time.perf_counter()
+    for i in range(count):
+        func(i)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<40} {count / elapsed:12.0f} ops/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--inserts", type=int, default=20_000)
+    parser.add_argument("--reports", type=int, default=2_000)
+    args = parser.parse_args()
+
+    # synchronous=OFF keeps fsync out of the numbers, only sql handling is compared
+    with scratch_client(
+        Dataset(rows=args.rows), ConnectionProfile(synchronous="off")
+    ) as client:
+        conn = sqlite3.connect(client.path)
+        conn.execute("PRAGMA synchronous = OFF")
+
+        def expense(i: int) -> Expense:
+            return Expense(i, Category(1 + i % 10), User(1 + i % 20), Group(1), "")
+
+        # a narrow, always different window keeps query execution cheap relative
+        # to parsing, like distinct users asking for reports in production
+        def request(i: int) -> ReportRequest:
+            start = time.gmtime(time.time() - 3600 - i)
+            return ReportRequest(
+                User(1),
+                Group(1 + i % 5),
+                cb.report_by_date,
+                time.strftime("%Y-%m-%d %H:%M:%S", start),
+            )
+
+        per_second(
+            "report total bound parameters",
+            lambda i: bound_total(conn, request(i)),
+            args.reports,
+        )
+        per_second(
+            "report total inlined values",
+            lambda i: inline_total(conn, request(i)),
+            args.reports,
+        )
+
+        # the bare statements on the same connection, SqliteClient.insert also
+        # keeps the rollup up to date
+        def insert_bound(i: int) -> None:
+            bound_insert(conn, expense(i))
+            conn.commit()
+
+        def insert_inline(i: int) -> None:
+            inline_insert(conn, expense(i))
+            conn.commit()
+
+        per_second("insert bound parameters", insert_bound, args.inserts)
+        per_second("insert inlined values", insert_inline, args.inserts)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
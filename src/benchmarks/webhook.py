@@ -0,0 +1,108 @@
+"""Updates per second of the bot in webhook mode.
+
+The application of ``bot.py`` serves its webhook on localhost, with the
+telegram api replaced by a TelegramStub answering after ``--api-latency-ms``.
+``--users`` users post ``--updates`` synthetic updates, ``--concurrency`` at a
+time, alternating /start and /cats. Accepted is the rate the webhook answers
+the posts at, processed the rate the handlers finish the updates at.
+
+The bot runs in a temporary directory, so its database and state are new.
+
+Run from ``src``: ``python -m benchmarks.webhook --concurrency 40``
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+from telegram import Update
+from telegram.ext import ContextTypes, TypeHandler
+
+from benchmarks.common import TelegramStub, report, text_update
+
+SECRET_TOKEN = "benchmark"
+
+
+async def run(args) -> None:
+    # imported in the working directory of the run, which keeps the bot files
+    import bot
+
+    application = bot.build_application(TelegramStub(args.api_latency_ms / 1000))
+    processed = 0
+    done = asyncio.Event()
+
+    async def count(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        nonlocal processed
+        processed += 1
+        if processed == args.updates:
+            done.set()
+
+    # a later group than the bot handlers, called once they are done
+    application.add_handler(TypeHandler(Update, count), group=1)
+
+    # the steps of Application.run_webhook, without its signal handling
+    await application.initialize()
+    await application.post_init(application)
+    await application.updater.start_webhook(
+        port=args.port, url_path="webhook", secret_token=SECRET_TOKEN
+    )
+    await application.start()
+
+    updates = [
+        text_update(i, 1 + i % args.users, "/start" if i < args.users else "/cats")
+        for i in range(args.updates)
+    ]
+    slots = asyncio.Semaphore(args.concurrency)
+    timings: list[float] = []
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(limits=limits) as client:
+
+        async def post(update: dict) -> None:
+            async with slots:
+                start = time.perf_counter()
+                response = await client.post(
+                    f"http://127.0.0.1:{args.port}/webhook",
+                    json=update,
+                    headers={"X-Telegram-Bot-Api-Secret-Token": SECRET_TOKEN},
+                )
+                response.raise_for_status()
+                timings.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(post(update) for update in updates))
+        accepted = time.perf_counter() - start
+        await done.wait()
+        elapsed = time.perf_counter() - start
+
+    report("webhook post", timings)
+    print(f"{'accepted':<40} {args.updates / accepted:12.0f} updates/s")
+    print(f"{'processed':<40} {args.updates / elapsed:12.0f} updates/s")
+
+    await application.updater.stop()
+    await application.stop()
+    await application.shutdown()
+    await application.post_shutdown(application)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--updates", type=int, default=2_000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=40)
+    parser.add_argument("--api-latency-ms", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8787)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            asyncio.run(run(args))
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
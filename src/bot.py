@@ -1,17 +1,24 @@
+import asyncio
+from functools import partial
+
 from telegram import BotCommand, Update
 from telegram.ext import (
+    Application,
     ApplicationBuilder,
     CommandHandler,
     ContextTypes,
     ConversationHandler,
-    PicklePersistence,
 )
+from telegram.request import BaseRequest
 
+from application import UserOrderedApplication
+from backend.db import CONNECTION_PROFILES, db_client
+from backend.persistence import SqlitePersistence
 from categories.conversation import (
     categories_conversation,
     send_groups_for_manage_categories,
 )
-from config import config, create_logger
+from config import PERSISTENCE_PATH, PICKLE_PERSISTENCE_PATH, config, create_logger
 from constants.states import (
     AUTH,
     CAT,
@@ -30,12 +37,16 @@ from expenses.conversation_manage_expense import (
 )
 from groups.conversation import groups_conversation, send_menu_manage_groups
 from groups.groups import register_user
+from reports.cache import report_cache
+from reports.chart_cache import chart_cache
 from reports.conversation import reports_conversation, send_group_for_report_menu
+from reports.renderer import chart_renderer
+from session import Context, Session
 
 logger = create_logger(__name__)
 
 
-async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+async def start(update: Update, context: Context) -> int:
     id: int = update.effective_user.id  # type: ignore
     await context.bot.set_my_commands(
         [
@@ -46,7 +57,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
             BotCommand("groups", "Управление группами"),
         ]
     )
-    register_user(id, update.effective_user.username)  # type: ignore
+    await register_user(id, update.effective_user.username)  # type: ignore
 
     await update.message.reply_text(
         f"Добро пожаловать в Money Tracker, теперь создайте через меню группы для учета расходов или попросите добавить вас в группу, ваш user_id {id}"  # type: ignore
@@ -54,15 +65,46 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     return AUTH
 
 
-def main() -> None:
-    bot_persistence = PicklePersistence(filepath="persistance_states")
+async def startup(application: Application) -> None:
+    await db_client.open()
+    await asyncio.to_thread(chart_cache.prune)
+    if config.chart_prewarm:
+        application.create_task(chart_renderer.warm_up())
+
+
+async def shutdown(_: Application) -> None:
+    await db_client.flush()
+    if stats := db_client.insert_stats():
+        logger.info("insert buffer %s", stats)
+    logger.info("report cache %s", report_cache.stats())
+    await chart_renderer.shutdown()
+
 
-    bot = (
+def build_application(request: BaseRequest | None = None) -> Application:
+    """Application with every handler, ``request`` replaces the telegram connection."""
+    bot_persistence = SqlitePersistence(
+        PERSISTENCE_PATH,
+        PICKLE_PERSISTENCE_PATH,
+        CONNECTION_PROFILES[config.db_profile],
+        load_user_data=Session.load,
+    )
+
+    builder = (
         ApplicationBuilder()
         .token(config.bot_token)
+        .context_types(ContextTypes(user_data=Session))
+        .application_class(
+            UserOrderedApplication, {"max_in_flight": config.concurrent_updates}
+        )
+        # a task per update, the application queues the updates of busy users
+        .concurrent_updates(True)
         .persistence(persistence=bot_persistence)
-        .build()
+        .post_init(startup)
+        .post_shutdown(shutdown)
     )
+    if request is not None:
+        builder = builder.request(request).get_updates_request(request)
+    bot = builder.build()
 
     menu = [
         CommandHandler("add", send_groups_for_add_expenses),
@@ -87,7 +129,28 @@ def main() -> None:
         fallbacks=[*menu],  # type: ignore
     )
     bot.add_handler(conv_handler)
-    bot.run_polling()
+    return bot
+
+
+def main() -> None:
+    bot = build_application()
+    if config.run_mode == "webhook":
+        run_webhook = partial(
+            bot.run_webhook,
+            listen=config.webhook_listen,
+            port=config.webhook_port,
+            url_path=config.webhook_path,
+            webhook_url=config.webhook_url,
+            max_connections=config.webhook_max_connections,
+        )
+        # an empty token would still be checked against the header
+        if config.webhook_secret_token:
+            run_webhook = partial(run_webhook, secret_token=config.webhook_secret_token)
+        run_webhook()
+    elif config.run_mode == "polling":
+        bot.run_polling()
+    else:
+        raise ValueError(f"Unknown run mode {config.run_mode}")
 
 
 if __name__ == "__main__":
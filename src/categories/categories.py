@@ -1,25 +1,41 @@
-from backend.db import Category, DataBaseClient, Group
+from backend.db import AsyncDataBaseClient, Category, Group, db_client
+from reports.cache import report_cache
 
 
 class Categories:
-    def __init__(self, db: DataBaseClient, group: Group) -> None:
+    def __init__(self, db: AsyncDataBaseClient, group: Group) -> None:
         self._db = db
         self._categories: dict[int, Category] = {}
         self._categories_reversed: dict[str, int] = {}
         self._group = group
-        self._load_categories()
 
-    def append(self, category: str) -> None:
-        self._db.insert_category(category, self._group)
-        self._load_categories()
+    @classmethod
+    async def load(cls, db: AsyncDataBaseClient, group: Group) -> "Categories":
+        categories = cls(db, group)
+        await categories._load_categories()
+        return categories
 
-    def __delitem__(self, category: int) -> None:
-        self._db.delete_category(category, self._group)
-        self._load_categories()
+    async def append(self, category: str) -> None:
+        id = await self._db.insert_category(category, self._group)
+        report_cache.invalidate(self._group)
+        # a re-added category replaces its previous row
+        self._categories.pop(self._categories_reversed.pop(category, -1), None)
+        self._categories[id] = Category(id, category)
+        self._categories_reversed[category] = id
+
+    async def delete(self, category: int) -> None:
+        await self._db.delete_category(category, self._group)
+        report_cache.invalidate(self._group)
+        deleted = self._categories.pop(category, None)
+        if deleted is not None:
+            self._categories_reversed.pop(deleted.name, None)
 
     def __getitem__(self, value: int) -> Category:
         return self._categories[value]
 
+    def __contains__(self, value: int) -> bool:
+        return value in self._categories
+
     def __iter__(self):
         for cat in self._categories.values():
             yield cat
@@ -27,10 +43,11 @@ class Categories:
     def get_category_id(self, category: str) -> int:
         return self._categories_reversed[category]
 
-    def _load_categories(self) -> None:
-        self._categories.clear()
-        self._categories_reversed.clear()
-        self._db.load_categories(self._categories, self._group)
+    async def _load_categories(self) -> None:
+        categories: dict[int, Category] = {}
+        await self._db.load_categories(categories, self._group)
+        self._categories = categories
+        self._categories_reversed = {}
         self._reverse_categories()
 
     def _reverse_categories(self) -> None:
@@ -39,3 +56,40 @@ class Categories:
 
     def __len__(self) -> int:
         return len(self._categories)
+
+
+class CategoryRegistry:
+    """Categories of every group, shared by all handlers.
+
+    A group is loaded from the database on first use and then kept up to date
+    in place by ``Categories.append`` and ``Categories.delete``. Categories
+    changed outside of the bot are picked up after ``invalidate``.
+    """
+
+    def __init__(self, db: AsyncDataBaseClient) -> None:
+        self._db = db
+        self._groups: dict[int, Categories] = {}
+        self._generation = 0
+
+    async def get(self, group: Group) -> Categories:
+        categories = self._groups.get(group.id)
+        if categories is not None:
+            return categories
+        generation = self._generation
+        categories = await Categories.load(self._db, group)
+        # an invalidate while loading makes the result stale
+        if generation != self._generation:
+            return categories
+        # concurrent loads of a group share the first one that finished
+        return self._groups.setdefault(group.id, categories)
+
+    def invalidate(self, group: Group | None = None) -> None:
+        """Drop the categories of ``group``, or of every group."""
+        self._generation += 1
+        if group is None:
+            self._groups.clear()
+        else:
+            self._groups.pop(group.id, None)
+
+
+category_registry = CategoryRegistry(db_client)
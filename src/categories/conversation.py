@@ -1,20 +1,18 @@
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import (
     CallbackQueryHandler,
-    ContextTypes,
     ConversationHandler,
     MessageHandler,
     filters,
 )
 
-from backend.db import db_client
-from categories.categories import Categories
+from categories.categories import category_registry
 from config import create_logger
 from constants import callbacks as cb
 from constants.states import AUTH, CAT, CAT_ADD, CAT_DEL
-from constants.userdata import UserData
 from decorators import log
 from groups.groups import save_group, send_groups
+from session import Context
 from utils import make_inline_menu, send_message
 
 logger = create_logger(__name__)
@@ -22,16 +20,12 @@ END = ConversationHandler.END
 
 
 @log(logger)
-async def send_groups_for_manage_categories(
-    update: Update, context: ContextTypes.DEFAULT_TYPE
-) -> int:
+async def send_groups_for_manage_categories(update: Update, context: Context) -> int:
     return await send_groups(update, context, send_menu_manage_categories, CAT)
 
 
 @log(logger)
-async def send_menu_manage_categories(
-    update: Update, context: ContextTypes.DEFAULT_TYPE
-) -> int:
+async def send_menu_manage_categories(update: Update, context: Context) -> int:
     await save_group(update, context)
 
     keyboard = [
@@ -44,9 +38,7 @@ async def send_menu_manage_categories(
 
 
 @log(logger)
-async def request_category_name_to_add(
-    update: Update, context: ContextTypes.DEFAULT_TYPE
-) -> int:
+async def request_category_name_to_add(update: Update, context: Context) -> int:
     query = update.callback_query
     await query.answer()
     await send_message(update, context, "Введите название категории")
@@ -54,34 +46,32 @@ async def request_category_name_to_add(
 
 
 @log(logger)
-async def add_category(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+async def add_category(update: Update, context: Context) -> int:
     category = update.message.text
-    categories = Categories(db_client, context.user_data.get(UserData.group))
-    categories.append(category)
+    categories = await category_registry.get(context.user_data.group)
+    await categories.append(category)
     await send_message(update, context, f"Категория {category} добавлена")
     return END
 
 
 @log(logger)
-async def chouse_category_name_to_delete(
-    update: Update, context: ContextTypes.DEFAULT_TYPE
-) -> int:
+async def chouse_category_name_to_delete(update: Update, context: Context) -> int:
     query = update.callback_query
     await query.answer()
 
-    categories = Categories(db_client, context.user_data.get(UserData.group))
+    categories = await category_registry.get(context.user_data.group)
     replay_markup = make_inline_menu(categories)
     await send_message(update, context, "Выберет категорию", replay_markup)
     return CAT_DEL
 
 
 @log(logger)
-async def delete_category(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+async def delete_category(update: Update, context: Context) -> int:
     query = update.callback_query
     await query.answer()
     id = int(query.data.split()[1])
-    categories = Categories(db_client, context.user_data.get(UserData.group))
-    del categories[id]
+    categories = await category_registry.get(context.user_data.group)
+    await categories.delete(id)
     await send_message(update, context, "Категория удалена")
     return END
 
@@ -5,6 +5,21 @@ from dataclasses import dataclass
 from logging.handlers import TimedRotatingFileHandler
 
 MONTH_START_DAY = 10
+# expenses shown on one page of the expense list
+PAGE_SIZE = 30
+# characters of the category and comment of a listed expense, so that a page
+# stays under the 4096 characters of a telegram message
+LIST_CATEGORY_LENGTH = 32
+LIST_COMMENT_LENGTH = 64
+# characters of rendered reports kept in memory and their lifetime in seconds
+REPORT_CACHE_SIZE = 4 * 1024 * 1024
+REPORT_CACHE_TTL = 15 * 60
+# rendered charts and their telegram file ids
+CHART_CACHE_DIR = pathlib.Path("chart_cache")
+CHART_CACHE_MAX_FILES = 2000
+# bot conversation state, and the PicklePersistence file it is imported from
+PERSISTENCE_PATH = pathlib.Path("persistence.db")
+PICKLE_PERSISTENCE_PATH = pathlib.Path("persistance_states")
 
 log_dir = pathlib.Path(__name__).parent / "logs"
 log_dir.mkdir(exist_ok=True)
@@ -13,13 +28,61 @@ log_dir.mkdir(exist_ok=True)
 @dataclass
 class Config:
     bot_token: str
+    chart_workers: int = 2
+    chart_queue_size: int = 8
+    chart_profile_total: str = "phone"
+    chart_profile_trend: str = "phone"
+    # start the chart workers in the background once the bot runs
+    chart_prewarm: bool = False
+    db_profile: str = "wal"
+    db_readers: int = 4
+    # expenses committed together by the insert buffer, 0 disables it
+    insert_batch_rows: int = 0
+    insert_batch_ms: int = 20
+    # updates of different users handled at the same time, 1 handles them in turn
+    concurrent_updates: int = 32
+    # "polling" or "webhook"
+    run_mode: str = "polling"
+    # address of the webhook server, usually behind a https reverse proxy
+    webhook_listen: str = "127.0.0.1"
+    webhook_port: int = 8443
+    webhook_path: str = ""
+    # public url telegram posts the updates to, required with the webhook
+    webhook_url: str = ""
+    # checked against the X-Telegram-Bot-Api-Secret-Token header of every update
+    webhook_secret_token: str = ""
+    # parallel connections telegram opens to deliver updates
+    webhook_max_connections: int = 40
 
 
 def get_config() -> Config:
     token = os.environ.get("bot_token")
     if not token:
         raise ValueError("Token is not set in os environ")
-    return Config(token)
+    run_mode = os.environ.get("run_mode", "polling")
+    webhook_url = os.environ.get("webhook_url", "")
+    if run_mode == "webhook" and not webhook_url:
+        raise ValueError("Webhook url is not set in os environ")
+    return Config(
+        token,
+        chart_workers=int(os.environ.get("chart_workers", 2)),
+        chart_queue_size=int(os.environ.get("chart_queue_size", 8)),
+        chart_profile_total=os.environ.get("chart_profile_total", "phone"),
+        chart_profile_trend=os.environ.get("chart_profile_trend", "phone"),
+        chart_prewarm=os.environ.get("chart_prewarm", "") == "1",
+        db_profile=os.environ.get("db_profile", "wal"),
+        db_readers=int(os.environ.get("db_readers", 4)),
+        insert_batch_rows=int(os.environ.get("insert_batch_rows", 0)),
+        insert_batch_ms=int(os.environ.get("insert_batch_ms", 20)),
+        concurrent_updates=int(os.environ.get("concurrent_updates", 32)),
+        run_mode=run_mode,
+        webhook_listen=os.environ.get("webhook_listen", "127.0.0.1"),
+        webhook_port=int(os.environ.get("webhook_port", 8443)),
+        webhook_path=os.environ.get("webhook_path", ""),
+        webhook_url=webhook_url,
+        webhook_secret_token=os.environ.get("webhook_secret_token", ""),
+        webhook_max_connections=int(os.environ.get("webhook_max_connections", 40)),
+    )
 
 
 config = get_config()
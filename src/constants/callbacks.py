@@ -18,6 +18,9 @@ report_all = "report_all"
 report_by_date = "created_at"
 report_by_amount = "category, amount desc"
 
+page_next = "page_next"
+page_prev = "page_prev"
+
 manage_move_expense = "manage_move_expense"
 manage_delete_expense = "manage_delete_expense"
 
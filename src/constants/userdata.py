@@ -1,6 +1,8 @@
 from enum import Enum
 
 
+# keys of the user data dict used before session.Session, kept to read state
+# saved by earlier versions
 class UserData(Enum):
     group = "group"
     msg_id = "msg_id"
@@ -9,3 +11,6 @@ class UserData(Enum):
     all = "all"
     func = "func"
     group_action = "group_action"
+    ordering = "ordering"
+    pages = "pages"
+    next_page = "next_page"
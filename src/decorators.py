@@ -1,12 +1,11 @@
 import logging
 from functools import wraps
 
-from telegram import Message, Update
+from telegram import Update
 from telegram.error import BadRequest
-from telegram.ext import ContextTypes
 
 from config import create_logger
-from constants.userdata import UserData
+from session import Context
 
 logger = create_logger(__name__)
 
@@ -14,21 +13,17 @@ logger = create_logger(__name__)
 def delete_old_message(logger: logging.Logger):
     def inner(func):
         @wraps(func)
-        async def wrapper(
-            update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs
-        ):
-            if UserData.msg_id in context.user_data:
-                old_msg_id = context.user_data.pop(UserData.msg_id)
-                if old_msg_id and update.effective_user:
-                    if isinstance(old_msg_id, Message):
-                        old_msg_id = old_msg_id.id
-                    try:
-                        await context.bot.delete_message(
-                            update.effective_user.id, old_msg_id
-                        )
-                    except BadRequest as e:
-                        logger.exception(e)
-                        pass
+        async def wrapper(update: Update, context: Context, *args, **kwargs):
+            old_msg_id = context.user_data.msg_id
+            context.user_data.msg_id = None
+            if old_msg_id and update.effective_user:
+                try:
+                    await context.bot.delete_message(
+                        update.effective_user.id, old_msg_id
+                    )
+                except BadRequest as e:
+                    logger.exception(e)
+                    pass
             return await func(update, context, *args, **kwargs)
 
         return wrapper
@@ -39,23 +34,19 @@ def delete_old_message(logger: logging.Logger):
 def log(logger: logging.Logger):
     def inner(func):
         @wraps(func)
-        async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        async def wrapper(update: Update, context: Context):
             text = update.message.text if update.message else ""
             data = (
                 update.callback_query.data
                 if update.callback_query
                 else "no callback_query"
             )
-            if context.user_data:
-                userdata = ";".join([f"{k}:{v}" for k, v in context.user_data.items()])
-            else:
-                userdata = ""
             text = f"text = {text} and callback data = {data}"
             logger.info(
                 "calling function %s with args %s and user_data %s",
                 func.__name__,
                 text,
-                userdata,
+                context.user_data,
             )
             return await func(update, context)
 
@@ -3,7 +3,6 @@ import re
 from telegram import Update
 from telegram.ext import (
     CallbackQueryHandler,
-    ContextTypes,
     ConversationHandler,
     MessageHandler,
     filters,
@@ -11,13 +10,13 @@ from telegram.ext import (
 
 import constants.callbacks as cb
 from backend.db import User, db_client
-from categories.categories import Categories
+from categories.categories import category_registry
 from config import create_logger
 from constants.states import AUTH, EXPENSE_ADD
-from constants.userdata import UserData
 from decorators import log
 from expenses.expenses import ExpenseManager
 from groups.groups import save_group, send_groups
+from session import Context
 from utils import make_inline_menu, send_message
 
 logger = create_logger(__name__)
@@ -25,16 +24,14 @@ END = ConversationHandler.END
 
 
 @log(logger)
-async def send_groups_for_add_expenses(
-    update: Update, context: ContextTypes.DEFAULT_TYPE
-) -> int:
+async def send_groups_for_add_expenses(update: Update, context: Context) -> int:
     return await send_groups(update, context, send_categories, EXPENSE_ADD)
 
 
 @log(logger)
-async def send_categories(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+async def send_categories(update: Update, context: Context) -> int:
     group = await save_group(update, context)
-    categories = Categories(db_client, group)
+    categories = await category_registry.get(group)
     if not categories:
         await send_message(
             update, context, "у вам нет категрий для расходов, создайте через меню"
@@ -47,14 +44,12 @@ async def send_categories(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
 
 @log(logger)
-async def request_expense_amount_for_category(
-    update: Update, context: ContextTypes.DEFAULT_TYPE
-) -> int:
+async def request_expense_amount_for_category(update: Update, context: Context) -> int:
     query = update.callback_query
     await query.answer()
-    categories = Categories(db_client, context.user_data.get(UserData.group))
+    categories = await category_registry.get(context.user_data.group)
     category = categories[int(query.data.split()[1])]
-    context.user_data[UserData.category] = category  # type: ignore
+    context.user_data.category_id = category.id
     await send_message(
         update,
         context,
@@ -64,7 +59,7 @@ async def request_expense_amount_for_category(
 
 
 @log(logger)
-async def insert_expense(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+async def insert_expense(update: Update, context: Context) -> int:
     text = re.match(r"(\d+)(.*)", update.message.text)
 
     if not text or not text.group(0) or not text.group(1):
@@ -72,15 +67,16 @@ async def insert_expense(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         return EXPENSE_ADD
     if not update.effective_user:
         return EXPENSE_ADD
-    if not context.user_data:
+    group = context.user_data.group
+    categories = await category_registry.get(group) if group else None
+    if not categories or context.user_data.category_id not in categories:
         await update.message.reply_text("сначала выберете категорию")
         return EXPENSE_ADD
 
-    category = context.user_data.get(UserData.category)
-    group = context.user_data.get(UserData.group)
+    category = categories[context.user_data.category_id]
 
     expense_manger = ExpenseManager(db_client, User(update.effective_user.id), group)
-    expense_manger.save_expense(
+    await expense_manger.save_expense(
         int(text.group(1)),
         category,
         text.group(2),
@@ -1,39 +1,40 @@
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import (
     CallbackQueryHandler,
-    ContextTypes,
     ConversationHandler,
     MessageHandler,
     filters,
 )
 
 import constants.callbacks as cb
-from backend.db import Category, ReportRequest, User, db_client
-from categories.categories import Categories
+from backend.db import ReportRequest, User, db_client
+from categories.categories import category_registry
 from config import create_logger
 from constants.states import AUTH, EXPENSE_DELETE, EXPENSE_MANAGE, EXPENSE_MOVE
-from constants.userdata import UserData
 from decorators import log
 from expenses.expenses import ExpenseManager
 from groups.groups import save_group, send_groups
 from reports.reports import get_expenses_list_with_ids
-from utils import make_inline_menu, send_message, validate_message_expense_ids
+from session import Context
+from utils import (
+    make_inline_menu,
+    make_page_buttons,
+    send_message,
+    turn_page,
+    validate_message_expense_ids,
+)
 
 logger = create_logger(__name__)
 END = ConversationHandler.END
 
 
 @log(logger)
-async def send_groups_for_manage_expenses(
-    update: Update, context: ContextTypes.DEFAULT_TYPE
-) -> int:
+async def send_groups_for_manage_expenses(update: Update, context: Context) -> int:
     return await send_groups(update, context, send_menu_manage_expenses, EXPENSE_MANAGE)
 
 
 @log(logger)
-async def send_menu_manage_expenses(
-    update: Update, context: ContextTypes.DEFAULT_TYPE
-) -> int:
+async def send_menu_manage_expenses(update: Update, context: Context) -> int:
     await save_group(update, context)
 
     keyboard = [
@@ -46,11 +47,15 @@ async def send_menu_manage_expenses(
 
 
 @log(logger)
-async def move_expense_request_categories(
-    update: Update, context: ContextTypes.DEFAULT_TYPE
-) -> int:
+async def move_expense_request_categories(update: Update, context: Context) -> int:
 
-    message, replay_markup = await _build_id_map(update, context)
+    message, page_buttons = await _build_id_map(update, context)
+    categories = await category_registry.get(context.user_data.group)
+    replay_markup = make_inline_menu(categories)
+    if page_buttons:
+        replay_markup = InlineKeyboardMarkup(
+            [*replay_markup.inline_keyboard, page_buttons]
+        )
 
     await send_message(
         update, context, f"{message}\n\nВыберете новую категорию", replay_markup
@@ -59,12 +64,10 @@ async def move_expense_request_categories(
 
 
 @log(logger)
-async def select_new_category(
-    update: Update, context: ContextTypes.DEFAULT_TYPE
-) -> int:
+async def select_new_category(update: Update, context: Context) -> int:
     query = update.callback_query
     await query.answer()
-    context.user_data[UserData.category] = Category(int(query.data.split()[1]))
+    context.user_data.category_id = int(query.data.split()[1])
 
     await send_message(
         update,
@@ -76,10 +79,10 @@ async def select_new_category(
 
 
 @log(logger)
-async def move_expense(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
-    id_map = context.user_data.get(UserData.id_map)
-    new_category = context.user_data.get(UserData.category)
-    ids = validate_message_expense_ids(update.message.text, id_map)
+async def move_expense(update: Update, context: Context) -> int:
+    ids = validate_message_expense_ids(
+        update.message.text, context.user_data.expense_ids
+    )
     if not ids:
         await send_message(update, context, "неверный формат, попробуйте снова")
         return END
@@ -87,58 +90,58 @@ async def move_expense(update: Update, context: ContextTypes.DEFAULT_TYPE) -> in
     expense_manger = ExpenseManager(
         db_client,
         User(update.effective_user.id),
-        context.user_data.get(UserData.group),
+        context.user_data.group,
     )
-    for id in ids:
-        expense_manger.move_expense(id, new_category.id)
+    await expense_manger.move_expenses(ids, context.user_data.category_id)
     await send_message(update, context, "готово")
     return END
 
 
 @log(logger)
-async def delete_expense_request(
-    update: Update, context: ContextTypes.DEFAULT_TYPE
-) -> int:
-    message, _ = await _build_id_map(update, context)
+async def delete_expense_request(update: Update, context: Context) -> int:
+    message, page_buttons = await _build_id_map(update, context)
     await send_message(
         update,
         context,
         f"{message}\n\nВведите номер или номера расходов для удаления через запятую",
+        InlineKeyboardMarkup([page_buttons]) if page_buttons else None,
     )
     return EXPENSE_DELETE
 
 
 @log(logger)
-async def delete_expense(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
-    id_map = context.user_data.get(UserData.id_map)
-    ids = validate_message_expense_ids(update.message.text, id_map)
+async def delete_expense(update: Update, context: Context) -> int:
+    ids = validate_message_expense_ids(
+        update.message.text, context.user_data.expense_ids
+    )
     if not ids:
         await send_message(update, context, "неверный формат, попробуйте снова")
         return END
     expense_manger = ExpenseManager(
         db_client,
         User(update.effective_user.id),
-        context.user_data.get(UserData.group),
+        context.user_data.group,
     )
-    for id in ids:
-        expense_manger.del_expense(id)
+    await expense_manger.del_expenses(ids)
     await send_message(update, context, "готово")
     return END
 
 
 async def _build_id_map(
-    update: Update, context: ContextTypes.DEFAULT_TYPE
-) -> tuple[str, InlineKeyboardMarkup]:
+    update: Update, context: Context
+) -> tuple[str, list[InlineKeyboardButton]]:
     query = update.callback_query
     await query.answer()
-    group = context.user_data.get(UserData.group)
-    expenses, id_map = get_expenses_list_with_ids(
-        ReportRequest(User(update.effective_user.id), group, cb.report_by_date)
+    group = context.user_data.group
+    page = turn_page(context.user_data, query.data)
+    expenses, expense_ids, next_page = await get_expenses_list_with_ids(
+        ReportRequest(
+            User(update.effective_user.id), group, cb.report_by_date, after=page
+        )
     )
-    context.user_data[UserData.id_map] = id_map
-    categories = Categories(db_client, group)
-    replay_markup = make_inline_menu(categories)
-    return expenses, replay_markup
+    context.user_data.expense_ids = expense_ids
+    context.user_data.next_page = next_page
+    return expenses, make_page_buttons(page, next_page)
 
 
 expense_manage_conversation = ConversationHandler(
@@ -164,9 +167,13 @@ expense_manage_conversation = ConversationHandler(
         ],
         EXPENSE_MOVE: [
             CallbackQueryHandler(select_new_category, pattern=cb.category_id),
+            CallbackQueryHandler(move_expense_request_categories, pattern=cb.page_next),
+            CallbackQueryHandler(move_expense_request_categories, pattern=cb.page_prev),
             MessageHandler(~filters.COMMAND, move_expense),
         ],
         EXPENSE_DELETE: [
+            CallbackQueryHandler(delete_expense_request, pattern=cb.page_next),
+            CallbackQueryHandler(delete_expense_request, pattern=cb.page_prev),
             MessageHandler(~filters.COMMAND, delete_expense),
         ],
     },
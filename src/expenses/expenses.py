@@ -1,19 +1,43 @@
-from backend.db import Category, DataBaseClient, Expense, Group, User
+from backend.db import AsyncDataBaseClient, Category, Expense, Group, User
+from reports.cache import report_cache
 
 
 class ExpenseManager:
-    def __init__(self, db: DataBaseClient, user: User, group: Group) -> None:
+    def __init__(self, db: AsyncDataBaseClient, user: User, group: Group) -> None:
         self._db = db
         self._user = user
         self._group = group
 
-    def save_expense(self, amount: int, category: Category, comment: str) -> int:
+    async def save_expense(self, amount: int, category: Category, comment: str) -> int:
         expense = Expense(amount, category, self._user, self._group, comment)
-        id = self._db.insert(expense)
+        id = await self._db.insert(expense)
+        report_cache.invalidate(self._group)
         return id
 
-    def del_expense(self, id: int) -> None:
-        self._db.del_expense(id)
+    async def save_expenses(
+        self, expenses: list[tuple[int, Category, str]]
+    ) -> list[int]:
+        ids = await self._db.insert_many(
+            [
+                Expense(amount, category, self._user, self._group, comment)
+                for amount, category, comment in expenses
+            ]
+        )
+        report_cache.invalidate(self._group)
+        return ids
 
-    def move_expense(self, id: int, new_category: int) -> None:
-        self._db.update_expense_category(id, new_category)
+    async def del_expense(self, id: int) -> None:
+        await self._db.del_expense(id)
+        report_cache.invalidate(self._group)
+
+    async def move_expense(self, id: int, new_category: int) -> None:
+        await self._db.update_expense_category(id, new_category)
+        report_cache.invalidate(self._group)
+
+    async def del_expenses(self, ids: list[int]) -> None:
+        await self._db.del_expenses(ids)
+        report_cache.invalidate(self._group)
+
+    async def move_expenses(self, ids: list[int], new_category: int) -> None:
+        await self._db.move_expenses(ids, new_category)
+        report_cache.invalidate(self._group)
@@ -1,14 +1,13 @@
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import (
     CallbackQueryHandler,
-    ContextTypes,
     ConversationHandler,
     MessageHandler,
     filters,
 )
 
 import constants.callbacks as cb
-from backend.db import Group, User, db_client
+from backend.db import Group, User
 from config import create_logger
 from constants.states import (
     AUTH,
@@ -17,9 +16,14 @@ from constants.states import (
     GROUPS_MANAGE,
     GROUPS_REMOVE_USER,
 )
-from constants.userdata import UserData
 from decorators import log
-from groups.groups import add_user_to_group, delete_group, delete_user_from_group
+from groups.groups import (
+    add_user_to_group,
+    delete_group,
+    delete_user_from_group,
+    group_membership,
+)
+from session import Context
 from utils import make_inline_menu, send_message
 
 logger = create_logger(__name__)
@@ -27,9 +31,7 @@ END = ConversationHandler.END
 
 
 @log(logger)
-async def send_menu_manage_groups(
-    update: Update, context: ContextTypes.DEFAULT_TYPE
-) -> int:
+async def send_menu_manage_groups(update: Update, context: Context) -> int:
     keyboard = [
         [InlineKeyboardButton("Создать", callback_data=cb.groups_create)],
         [InlineKeyboardButton("Удалить", callback_data=cb.groups_delete)],
@@ -46,27 +48,25 @@ async def send_menu_manage_groups(
 
 
 @log(logger)
-async def chouse_group(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+async def chouse_group(update: Update, context: Context) -> int:
     query = update.callback_query
     await query.answer()
 
-    groups = db_client.get_user_groups(update.effective_user.id)
+    groups = await group_membership.get_user_groups(update.effective_user.id)
     replay_markup = make_inline_menu(groups)
-    context.user_data[UserData.group_action] = query.data
+    context.user_data.group_action = query.data
     await send_message(update, context, "Выберете группу", replay_markup)
     return GROUPS_MANAGE
 
 
 @log(logger)
-async def perform_group_action(
-    update: Update, context: ContextTypes.DEFAULT_TYPE
-) -> int:
+async def perform_group_action(update: Update, context: Context) -> int:
     query = update.callback_query
     await query.answer()
 
-    action = context.user_data.get(UserData.group_action)
+    action = context.user_data.group_action
     group = Group(int(query.data.split()[1]))
-    context.user_data[UserData.group] = group
+    context.user_data.group = group
 
     message = ""
     status = END
@@ -77,14 +77,14 @@ async def perform_group_action(
         message = "Введите user id"
         status = GROUPS_REMOVE_USER
     elif action == cb.groups_delete:
-        delete_group(group)
+        await delete_group(group)
         message = "Группа удалена"
     await send_message(update, context, message)
     return status
 
 
 @log(logger)
-async def request_group_name(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+async def request_group_name(update: Update, context: Context) -> int:
     query = update.callback_query
     await query.answer()
     await send_message(update, context, "Введите название категории")
@@ -92,22 +92,22 @@ async def request_group_name(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
 
 @log(logger)
-async def create_group(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+async def create_group(update: Update, context: Context) -> int:
     group_name = update.message.text
-    db_client.create_group(update.effective_user.id, group_name)
+    await group_membership.create_group(update.effective_user.id, group_name)
     await send_message(update, context, f"Группа {group_name} созадана")
     return END
 
 
 @log(logger)
-async def add_user(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+async def add_user(update: Update, context: Context) -> int:
     try:
         user_id = int(update.message.text)
     except TypeError as e:
         logger.exception(e)
         await send_message(update, context, "Некорректный user id")
         return END
-    if not add_user_to_group(context.user_data.get(UserData.group), User(user_id)):
+    if not await add_user_to_group(context.user_data.group, User(user_id)):
         message = "Пользователь не зарегистрирован в боте."
     else:
         message = "Готово"
@@ -116,16 +116,14 @@ async def add_user(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
 
 
 @log(logger)
-async def remove_user_from_group(
-    update: Update, context: ContextTypes.DEFAULT_TYPE
-) -> int:
+async def remove_user_from_group(update: Update, context: Context) -> int:
     try:
         user_id = int(update.message.text)
     except TypeError as e:
         logger.exception(e)
         await send_message(update, context, "Некорректный user id")
         return END
-    delete_user_from_group(context.user_data.get(UserData.group), User(user_id))
+    await delete_user_from_group(context.user_data.group, User(user_id))
     await send_message(update, context, "готово")
     return END
 
@@ -1,25 +1,121 @@
 from telegram import Update
-from telegram.ext import ContextTypes
 
-from backend.db import Group, User, db_client
+from backend.db import AsyncDataBaseClient, Group, User, db_client
+from categories.categories import category_registry
 from config import create_logger
-from constants.userdata import UserData
+from session import Context
 from utils import make_inline_menu
 
 logger = create_logger(__name__)
 
 
-def register_user(user_id: int, username: str) -> None:
-    db_client.register_user(user_id, username)
+class GroupMembership:
+    """Registered users and the groups of every user, shared by all handlers.
 
+    The groups of a user are loaded on first use and then kept up to date by
+    the writes made through this class. ``group -> members`` holds only the
+    users whose groups are loaded, it tells whose lists a group change
+    touches. Changes made outside of the bot are picked up after
+    ``invalidate``.
+    """
 
-async def send_groups(
-    update: Update, context: ContextTypes.DEFAULT_TYPE, func, state: int
-) -> int:
+    def __init__(self, db: AsyncDataBaseClient) -> None:
+        self._db = db
+        self._user_groups: dict[int, dict[int, Group]] = {}
+        self._group_members: dict[int, set[int]] = {}
+        self._registered: set[int] = set()
+        self._generation = 0
+
+    async def get_user_groups(self, user_id: int) -> list[Group]:
+        groups = self._user_groups.get(user_id)
+        if groups is None:
+            generation = self._generation
+            loaded = await self._db.get_user_groups(user_id)
+            groups = {group.id: group for group in loaded}
+            # a membership change while loading makes the result stale
+            if generation == self._generation:
+                self._user_groups[user_id] = groups
+                for group_id in groups:
+                    self._group_members.setdefault(group_id, set()).add(user_id)
+        return list(groups.values())
+
+    async def is_user_registred(self, user: User) -> bool:
+        if user.id in self._registered:
+            return True
+        registred = await self._db.is_user_registred(user)
+        if registred:
+            self._registered.add(user.id)
+        return registred
+
+    async def register_user(self, user_id: int, username: str) -> None:
+        await self._db.register_user(user_id, username)
+        self._registered.add(user_id)
+
+    async def create_group(self, user_id: int, name: str) -> Group:
+        group = await self._db.create_group(user_id, name)
+        self._join(group, user_id)
+        return group
+
+    async def delete_group(self, group: Group) -> None:
+        await self._db.delete_group(group)
+        self._generation += 1
+        for user_id in self._group_members.pop(group.id, set()):
+            self._user_groups.get(user_id, {}).pop(group.id, None)
+
+    async def add_user_to_group(self, group: Group, user: User) -> None:
+        await self._db.add_user_to_group(group, user)
+        self._join(group, user.id)
+
+    async def delete_user_from_group(self, group: Group, user: User) -> None:
+        await self._db.delete_user_from_group(group, user)
+        self._generation += 1
+        self._user_groups.get(user.id, {}).pop(group.id, None)
+        self._group_members.get(group.id, set()).discard(user.id)
+
+    def invalidate(self, user_id: int | None = None) -> None:
+        """Drop the groups of ``user_id``, or everything that is cached."""
+        self._generation += 1
+        if user_id is None:
+            self._user_groups.clear()
+            self._group_members.clear()
+            self._registered.clear()
+            return
+        for group_id in self._user_groups.pop(user_id, {}):
+            self._group_members.get(group_id, set()).discard(user_id)
+
+    def _join(self, group: Group, user_id: int) -> None:
+        self._generation += 1
+        groups = self._user_groups.get(user_id)
+        if groups is None:
+            return
+        # callbacks carry only the group id, the name is known to the members
+        named = self._find_group(group.id) if not group.name else group
+        if named is None:
+            self.invalidate(user_id)
+            return
+        groups[group.id] = named
+        self._group_members.setdefault(group.id, set()).add(user_id)
+
+    def _find_group(self, group_id: int) -> Group | None:
+        for user_id in self._group_members.get(group_id, set()):
+            group = self._user_groups.get(user_id, {}).get(group_id)
+            if group is not None:
+                return group
+        return None
+
+
+group_membership = GroupMembership(db_client)
+
+
+async def register_user(user_id: int, username: str) -> None:
+    await group_membership.register_user(user_id, username)
+
+
+async def send_groups(update: Update, context: Context, func, state: int) -> int:
     user_id = update.effective_user.id  # type: ignore
-    groups = db_client.get_user_groups(user_id)
+    groups = await group_membership.get_user_groups(user_id)
     if len(groups) == 1:
-        context.user_data[UserData.group] = Group(groups.pop().id)
+        context.user_data.group = groups.pop()
         return await func(update, context)
     elif not groups:
         message = "У вас нет групп, создайте группу"
@@ -27,30 +123,32 @@ async def send_groups(
     else:
         message = "Выберете группу"
         menu = make_inline_menu(groups)
-    context.user_data[UserData.msg_id] = await context.bot.send_message(  # type: ignore
+    msg = await context.bot.send_message(
         user_id, message, reply_markup=menu  # type: ignore
     )
+    context.user_data.msg_id = msg.id
     return state
 
 
-async def save_group(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Group:
+async def save_group(update: Update, context: Context) -> Group:
     query = update.callback_query
     if query:
         await query.answer()
-        context.user_data[UserData.group] = Group(int(query.data.split()[1]))
-    return context.user_data[UserData.group]
+        context.user_data.group_id = int(query.data.split()[1])
+    return context.user_data.group
 
 
-def delete_group(group: Group) -> None:
-    db_client.delete_group(group)
+async def delete_group(group: Group) -> None:
+    await group_membership.delete_group(group)
+    category_registry.invalidate(group)
 
 
-def add_user_to_group(group: Group, user: User) -> bool:
-    if db_client.is_user_registred(user):
-        db_client.add_user_to_group(group, user)
+async def add_user_to_group(group: Group, user: User) -> bool:
+    if await group_membership.is_user_registred(user):
+        await group_membership.add_user_to_group(group, user)
         return True
     return False
 
 
-def delete_user_from_group(group: Group, user: User) -> None:
-    db_client.delete_user_from_group(group, user)
+async def delete_user_from_group(group: Group, user: User) -> None:
+    await group_membership.delete_user_from_group(group, user)
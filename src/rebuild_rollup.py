@@ -0,0 +1,19 @@
+"""Recompute the expense rollup from the expenses table.
+
+Needed after MONTH_START_DAY is changed or expenses are edited by hand.
+Run from the repository root: ``python src/rebuild_rollup.py``
+"""
+import argparse
+
+from backend.db import SqliteClient
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", default="expenses.db")
+    args = parser.parse_args()
+    SqliteClient(args.db).rebuild_rollup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from cachetools import TTLCache
+
+from backend.db import Group, ReportRequest, period_calendar
+from config import REPORT_CACHE_SIZE, REPORT_CACHE_TTL, create_logger
+
+logger = create_logger(__name__)
+
+
+@dataclass(frozen=True)
+class ReportContent:
+    message: str
+    chart: str | None = None
+    next_page: tuple = ()
+
+
+def _content_size(content: ReportContent) -> int:
+    return len(content.message) + len(content.chart or "")
+
+
+class ReportCache:
+    """Rendered reports of a group until the group expenses or categories change.
+
+    Reports of the whole group are shared by its members, and entries are
+    kept per day, since the messages show the date they were made on.
+    Charts are kept by their chart cache key. Entries are evicted least
+    recently used once the cached text exceeds
+    ``maxsize`` and expire after ``ttl`` seconds, so reports starting from
+    a previous billing period do not live forever.
+    """
+
+    def __init__(self, maxsize: int, ttl: int) -> None:
+        self._cache: TTLCache = TTLCache(maxsize, ttl, getsizeof=_content_size)
+        self._generations: dict[int, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_build(
+        self,
+        report_type: str,
+        report: ReportRequest,
+        build: Callable[[ReportRequest], Awaitable[ReportContent]],
+    ) -> ReportContent:
+        key = (
+            report_type,
+            report.group.id,
+            None if report.all else report.user.id,
+            report.all,
+            report.ordering,
+            report.start,
+            report.after,
+            period_calendar.today(),
+        )
+        content = self._cache.get(key)
+        if content is not None:
+            self.hits += 1
+            return content
+        self.misses += 1
+        generation = self._generations.get(report.group.id, 0)
+        content = await build(report)
+        # a write to the group while building makes the result stale
+        if generation == self._generations.get(report.group.id, 0):
+            self._cache[key] = content
+        return content
+
+    def invalidate(self, group: Group) -> None:
+        self._generations[group.id] = self._generations.get(group.id, 0) + 1
+        for key in [key for key in self._cache.keys() if key[1] == group.id]:
+            self._cache.pop(key, None)
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._cache)}
+
+
+report_cache = ReportCache(REPORT_CACHE_SIZE, REPORT_CACHE_TTL)
@@ -0,0 +1,125 @@
+import asyncio
+import hashlib
+import json
+import os
+import pathlib
+from collections import OrderedDict
+from dataclasses import asdict
+
+from telegram import Message
+
+from config import CHART_CACHE_DIR, CHART_CACHE_MAX_FILES, create_logger
+from reports.renderer import chart_renderer
+
+logger = create_logger(__name__)
+
+
+class ChartCache:
+    """Rendered charts addressed by the hash of the data they are drawn from.
+
+    The image is kept on disk as ``<key>.chart``. Once it has been uploaded, the
+    telegram ``file_id`` is kept next to it as ``<key>.id`` and sent instead
+    of the bytes.
+
+    Every new chart is counted, once there are more than ``max_files`` the
+    least recently used ones are pruned on a worker thread down to 90% of the
+    limit, so that a prune is not needed after every following chart. A chart
+    pruned after it was rendered is drawn again when it is sent.
+    """
+
+    def __init__(self, directory: pathlib.Path, max_files: int) -> None:
+        self._dir = directory
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._max_files = max_files
+        self._file_ids: dict[str, str] = {}
+        # chart function and arguments of the last max_files keys rendered
+        self._charts: OrderedDict[str, tuple[str, tuple]] = OrderedDict()
+        # charts on disk, unknown until the first prune
+        self._files: int | None = None
+        self._pruning = False
+
+    @staticmethod
+    def key(chart: str, *args) -> str:
+        data = json.dumps(
+            [chart, args], sort_keys=True, ensure_ascii=False, default=asdict
+        )
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    async def render(self, chart: str, *args) -> str:
+        key = self.key(chart, *args)
+        self._charts[key] = (chart, args)
+        self._charts.move_to_end(key)
+        if len(self._charts) > self._max_files:
+            self._charts.popitem(last=False)
+        if not await asyncio.to_thread(_touch, self._dir / f"{key}.chart"):
+            await self._draw(key)
+        return key
+
+    async def _draw(self, key: str) -> bytes:
+        chart, args = self._charts[key]
+        image = await chart_renderer.render(chart, *args)
+        await asyncio.to_thread((self._dir / f"{key}.chart").write_bytes, image)
+        if self._files is not None:
+            self._files += 1
+        if self._files is None or self._files > self._max_files:
+            await self._prune_in_thread()
+        return image
+
+    async def _prune_in_thread(self) -> None:
+        if self._pruning:
+            return
+        self._pruning = True
+        try:
+            await asyncio.to_thread(self.prune, self._max_files * 9 // 10)
+        finally:
+            self._pruning = False
+
+    async def get_photo(self, key: str) -> str | bytes:
+        file_id = self._file_ids.get(key)
+        if file_id:
+            return file_id
+        saved_id = await asyncio.to_thread(_read, self._dir / f"{key}.id")
+        if saved_id:
+            self._file_ids[key] = file_id = saved_id.decode()
+            return file_id
+        image = await asyncio.to_thread(_read, self._dir / f"{key}.chart")
+        return image if image is not None else await self._draw(key)
+
+    async def save_file_id(self, key: str, message: Message) -> None:
+        if key in self._file_ids or not message.photo:
+            return
+        file_id = message.photo[-1].file_id
+        self._file_ids[key] = file_id
+        await asyncio.to_thread((self._dir / f"{key}.id").write_text, file_id)
+
+    def prune(self, keep: int | None = None) -> None:
+        """Drop the least recently used charts above ``keep``, max_files by default."""
+        keep = self._max_files if keep is None else keep
+        charts = sorted(
+            self._dir.glob("*.chart"), key=lambda path: path.stat().st_mtime
+        )
+        for path in charts[: max(len(charts) - keep, 0)]:
+            self._file_ids.pop(path.stem, None)
+            path.with_suffix(".id").unlink(missing_ok=True)
+            path.unlink(missing_ok=True)
+        self._files = min(len(charts), keep)
+        logger.info("chart cache pruned to %s files", self._files)
+
+
+def _touch(path: pathlib.Path) -> bool:
+    """Mark a file as just used, False when it is not there."""
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _read(path: pathlib.Path) -> bytes | None:
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+chart_cache = ChartCache(CHART_CACHE_DIR, CHART_CACHE_MAX_FILES)
@@ -0,0 +1,72 @@
+"""Chart rendering, executed in the chart worker processes.
+
+Figures are built with the object oriented matplotlib API and rendered by
+the Agg backend, so no pyplot global state is shared between renders. Only
+the workers import this module, matplotlib, numpy and Pillow are not loaded
+by the bot process.
+"""
+import io
+
+import matplotlib
+import numpy as np
+
+matplotlib.use("Agg")
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from reports.profiles import RenderProfile  # noqa: E402
+
+
+def warm_up() -> None:
+    """Load fonts and the canvas once when a worker process starts."""
+    _generate_file_chart(Figure(figsize=(1, 1)), RenderProfile(dpi=10))
+
+
+def generate_trend_chart(
+    labels: list[str],
+    series: list[list[float]],
+    months: list[str],
+    profile: RenderProfile,
+) -> bytes:
+    fig = Figure(figsize=profile.figsize, dpi=profile.dpi)
+    fig.set_facecolor("lightgrey")
+    ax = fig.subplots()
+    amounts = np.array(series)
+    bottoms = np.cumsum(amounts, axis=0) - amounts
+    bar_width = 0.4
+    for label, data, bottom in zip(labels, amounts, bottoms):
+        ax.bar(months, data, bar_width, label=label, bottom=bottom)
+    ax.legend()
+    table = ax.table(cellText=series, rowLabels=labels, colLabels=months, loc="bottom")
+    table.scale(1, 1.5)
+    fig.subplots_adjust(left=0.2, bottom=0.4)
+    ax.set_xticks([])
+    return _generate_file_chart(fig, profile)
+
+
+def generate_chart(data: dict[str, float], profile: RenderProfile) -> bytes:
+    fig = Figure(figsize=profile.figsize, dpi=profile.dpi)
+    fig.set_facecolor("lightgrey")
+    ax = fig.subplots()
+    ax.pie(list(data.values()), labels=list(data.keys()))
+    ax.axis("equal")
+    return _generate_file_chart(fig, profile)
+
+
+def _generate_file_chart(fig: Figure, profile: RenderProfile) -> bytes:
+    canvas = FigureCanvasAgg(fig)
+    b = io.BytesIO()
+    if profile.format == "png" and not profile.colors:
+        canvas.print_png(b)
+        return b.getvalue()
+
+    canvas.draw()
+    image = Image.frombuffer(
+        "RGBA", canvas.get_width_height(), canvas.buffer_rgba(), "raw", "RGBA", 0, 1
+    ).convert("RGB")
+    if profile.colors:
+        image = image.quantize(profile.colors)
+    image.save(b, format=profile.format, quality=profile.quality, optimize=True)
+    return b.getvalue()
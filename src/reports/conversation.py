@@ -1,29 +1,28 @@
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
-from telegram.ext import CallbackQueryHandler, ContextTypes, ConversationHandler
+from telegram.ext import CallbackQueryHandler, ConversationHandler
 
 from backend.db import ReportRequest, User
 from config import create_logger
 from constants import callbacks as cb
 from constants.states import AUTH, REPORTS
-from constants.userdata import UserData
 from decorators import delete_old_message, log
 from groups.groups import save_group, send_groups
+from reports.renderer import ChartRendererBusy
 from reports.reports import func_map
-from utils import send_message
+from session import Context
+from utils import send_message, turn_page
 
 logger = create_logger(__name__)
 END = ConversationHandler.END
 
 
 @log(logger)
-async def send_group_for_report_menu(
-    update: Update, context: ContextTypes.DEFAULT_TYPE
-) -> int:
+async def send_group_for_report_menu(update: Update, context: Context) -> int:
     return await send_groups(update, context, send_report_menu, REPORTS)
 
 
 @log(logger)
-async def send_report_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+async def send_report_menu(update: Update, context: Context) -> int:
     await save_group(update, context)
     keyboard = [
         [InlineKeyboardButton("Список", callback_data=cb.report_list)],
@@ -36,10 +35,10 @@ async def send_report_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -
 
 
 @log(logger)
-async def select_report_type(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+async def select_report_type(update: Update, context: Context) -> int:
     query = update.callback_query
     await query.answer()
-    context.user_data[UserData.func] = query.data
+    context.user_data.func = query.data
 
     keyboard = [
         [InlineKeyboardButton("Мои", callback_data=cb.report_my)],
@@ -51,12 +50,12 @@ async def select_report_type(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
 
 @log(logger)
-async def select_ordering(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+async def select_ordering(update: Update, context: Context) -> int:
     query = update.callback_query
     await query.answer()
-    context.user_data[UserData.all] = True if query.data == cb.report_all else False
+    context.user_data.all = query.data == cb.report_all
 
-    if context.user_data.get(UserData.func) in [cb.report_total, cb.report_trend]:
+    if context.user_data.func in [cb.report_total, cb.report_trend]:
         update.callback_query.data = "1"
         return await send_report(update, context)
 
@@ -72,22 +71,35 @@ async def select_ordering(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
 @log(logger)
 @delete_old_message(logger)
-async def send_report(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+async def send_report(update: Update, context: Context) -> int:
     query = update.callback_query
     await query.answer()
 
-    func = func_map[context.user_data[UserData.func]]
-    all = context.user_data[UserData.all]
-    group = context.user_data[UserData.group]
+    if query.data not in (cb.page_next, cb.page_prev):
+        context.user_data.ordering = query.data
+    page = turn_page(context.user_data, query.data)
+
+    session = context.user_data
     report = ReportRequest(
         user=User(int(update.effective_user.id)),
-        group=group,
-        ordering=query.data,
-        all=all,
+        group=session.group,
+        ordering=session.ordering,
+        all=session.all,
+        after=page,
     )
-    context.user_data[UserData.msg_id] = await func(query, report)
+    try:
+        msg, next_page = await func_map[session.func](query, report)
+    except ChartRendererBusy as e:
+        logger.warning(e)
+        await send_message(
+            update, context, "Сейчас строится много графиков, попробуйте позже"
+        )
+        return END
+    session.msg_id = msg.id
+    session.next_page = next_page
 
-    return END
+    # stay in the conversation while the page buttons can be pressed
+    return REPORTS if page or next_page else END
 
 
 reports_conversation = ConversationHandler(
@@ -103,6 +115,8 @@ reports_conversation = ConversationHandler(
         CallbackQueryHandler(select_ordering, pattern=cb.report_all),
         CallbackQueryHandler(send_report, pattern=cb.report_by_date),
         CallbackQueryHandler(send_report, pattern=cb.report_by_amount),
+        CallbackQueryHandler(send_report, pattern=cb.page_next),
+        CallbackQueryHandler(send_report, pattern=cb.page_prev),
     ],
     states={
         REPORTS: [
@@ -114,6 +128,8 @@ reports_conversation = ConversationHandler(
             CallbackQueryHandler(select_ordering, pattern=cb.report_all),
             CallbackQueryHandler(send_report, pattern=cb.report_by_date),
             CallbackQueryHandler(send_report, pattern=cb.report_by_amount),
+            CallbackQueryHandler(send_report, pattern=cb.page_next),
+            CallbackQueryHandler(send_report, pattern=cb.page_prev),
         ]
     },
     map_to_parent={END: AUTH},
@@ -1,33 +1,78 @@
-import io
 from collections import defaultdict
 from dataclasses import dataclass
-from datetime import datetime
+from typing import TYPE_CHECKING
 
-import matplotlib.pyplot as plt
+from backend.db import Category, Expense, User, period_calendar
+from config import LIST_CATEGORY_LENGTH, LIST_COMMENT_LENGTH, MONTH_START_DAY
 
-from backend.db import Category, Expense, User
-from config import MONTH_START_DAY
+if TYPE_CHECKING:
+    import numpy as np
 
 
 @dataclass
 class TrendData:
-    categories: set[Category]
+    """Trend amounts in thousands as a category x period x user matrix.
+
+    numpy is imported on the first trend report, not with the bot.
+    """
+
+    categories: list[Category]
     months: list[str]
-    accomulted_expenses: list[dict[Category, list[Expense]]]
+    users: list[User]
+    amounts: "np.ndarray"
+
+    @classmethod
+    def from_expenses(
+        cls, expenses: dict[str, list[Expense]], periods: list[str], months: list[str]
+    ) -> "TrendData":
+        """Build the matrix from expenses keyed by billing period start.
+
+        ``periods`` are the period keys of the matrix columns, ``months`` their labels.
+        """
+        import numpy as np
+
+        categories: dict[Category, int] = {}
+        users: dict[User, int] = {}
+        period_idx = {period: i for i, period in enumerate(periods)}
+        cells = []
+        for key, values in expenses.items():
+            if key not in period_idx:
+                continue
+            period = period_idx[key]
+            for expense in values:
+                category = categories.setdefault(expense.category, len(categories))
+                user = users.setdefault(expense.user, len(users))
+                cells.append((category, period, user, expense.amount))
+
+        amounts = np.zeros((len(categories), len(months), len(users)))
+        if cells:
+            category_cols, period_cols, user_cols, cell_amounts = np.array(cells).T
+            np.add.at(
+                amounts,
+                (
+                    category_cols.astype(int),
+                    period_cols.astype(int),
+                    user_cols.astype(int),
+                ),
+                cell_amounts / 1000,
+            )
+        return cls(list(categories), months, list(users), amounts)
+
+    def select(self, user: User, all: bool) -> "np.ndarray":
+        """Category x period amounts of everybody or of the user only."""
+        import numpy as np
+
+        if all:
+            return self.amounts.sum(axis=2)
+        if user not in self.users:
+            return np.zeros(self.amounts.shape[:2])
+        return self.amounts[:, :, self.users.index(user)]
 
     def get_chart_data(
         self, user: User, all: bool
     ) -> tuple[list[str], list[list[float]]]:
-        chart_data = []
-        labels = []
-        for category in self.categories:
-            month_expense_for_category = []
-            for expenses in self.accomulted_expenses:
-                expense = _filter_user_expenses(expenses.get(category, []), user, all)
-                month_expense_for_category.append(expense)
-            chart_data.append(month_expense_for_category)
-            labels.append(category.name)
-        return labels, chart_data
+        labels = [category.name for category in self.categories]
+        return labels, self.select(user, all).tolist()
 
 
 def _filter_user_expenses(expenses: list[Expense], user: User, all: bool) -> float:
@@ -36,8 +81,12 @@ def _filter_user_expenses(expenses: list[Expense], user: User, all: bool) -> flo
     return sum(exp.amount for exp in expenses) / 1000
 
 
+def _shorten(text: str, length: int) -> str:
+    return text if len(text) <= length else text[: length - 1] + "…"
+
+
 def get_init_message(user: User | None) -> str:
-    today = datetime.today().strftime("%d-%m-%Y")
+    today = period_calendar.today().strftime("%d-%m-%Y")
     if user:
         message = f"Тобой потрачено с {MONTH_START_DAY} числа месяца по {today}:\n\n"
     else:
@@ -61,70 +110,26 @@ def prepare_expense_message(
 def prepare_expense_message_last(
     expenses: dict[int, Expense], user: User, all: bool
 ) -> str:
-    message = get_init_message(user)
-    for i, (_, expense) in enumerate(expenses.items(), 1):
-        if all or user == expense.user:
-            if expense.comment:
-                message += f"{i:03}. {expense.category.name}: {expense.amount/1000:0.1f} т.р. ({expense.comment})\n"
-            else:
-                message += f"{i:03}. {expense.category.name}: {expense.amount/1000:0.1f} т.р.\n"
+    lines = [get_init_message(user)]
+    for i, expense in enumerate(expenses.values(), 1):
+        category = _shorten(str(expense.category.name), LIST_CATEGORY_LENGTH)
+        if expense.comment:
+            comment = _shorten(expense.comment, LIST_COMMENT_LENGTH)
+            lines.append(
+                f"{i:03}. {category}: {expense.amount/1000:0.1f} т.р. ({comment})\n"
+            )
+        else:
+            lines.append(f"{i:03}. {category}: {expense.amount/1000:0.1f} т.р.\n")
 
-    return message
+    return "".join(lines)
 
 
 def prepare_expense_message_month_trend(
     trend_expenses: TrendData, user: User, all: bool
 ) -> str:
     message = get_init_message(user)
-
-    for month, expenses in zip(
-        trend_expenses.months, trend_expenses.accomulted_expenses
-    ):
-        amount = 0.0
-        for expenses_per_category in expenses.values():
-            amount += _filter_user_expenses(expenses_per_category, user, all)
+    totals = trend_expenses.select(user, all).sum(axis=0)
+    for month, amount in zip(trend_expenses.months, totals.tolist()):
         message += f"{month}: {amount:n} тыс.руб\n"
 
     return message
-
-
-def generate_trend_chart(trend_expenses: TrendData, user: User, all: bool) -> bytes:
-    labels, series = trend_expenses.get_chart_data(user, all)
-    plt.tight_layout()
-    fig, ax = plt.subplots()
-    fig.set_facecolor("lightgrey")
-    bottom = [0.0] * len(series[0])
-    bar_width = 0.4
-    ax.bar(trend_expenses.months, series[0], bar_width, label=labels[0])
-    for i, (label, data) in enumerate(zip(labels[1:], series[1:])):
-        bottom = [sum(value) for value in zip(bottom, series[i])]
-        ax.bar(trend_expenses.months, data, bar_width, label=label, bottom=bottom)
-    ax.legend()
-    table = plt.table(
-        cellText=series, rowLabels=labels, colLabels=trend_expenses.months, loc="bottom"
-    )
-    table.scale(1, 1.5)
-    plt.subplots_adjust(left=0.2, bottom=0.4)
-    plt.xticks([])
-
-    file = _generate_file_chart()
-    plt.close()
-    return file
-
-
-def generate_chart(data: dict[str, float]) -> bytes:
-    fig, ax = plt.subplots()
-    fig.set_facecolor("lightgrey")
-    ax.pie(list(data.values()), labels=list(data.keys()))
-    ax.axis("equal")
-    file = _generate_file_chart()
-    plt.close()
-    return file
-
-
-def _generate_file_chart() -> bytes:
-    b = io.BytesIO()
-    plt.savefig(b, format="png", dpi=300)
-    b.seek(0)
-    file = b.read()
-    return file
@@ -0,0 +1,33 @@
+"""Render profiles of the charts, importable without the rendering libraries."""
+from dataclasses import dataclass
+
+FORMATS = ("png", "jpeg", "webp")
+
+
+@dataclass(frozen=True)
+class RenderProfile:
+    """Resolution and encoding of a rendered chart.
+
+    ``colors`` quantizes a png to a palette of that many colors, 0 keeps the
+    full color image. ``quality`` is used by the lossy formats.
+    """
+
+    dpi: int = 300
+    figsize: tuple[float, float] = (6.4, 4.8)
+    format: str = "png"
+    quality: int = 85
+    colors: int = 0
+
+    def __post_init__(self) -> None:
+        if self.format not in FORMATS:
+            raise ValueError(f"Unknown chart format {self.format}")
+        if self.colors and self.format != "png":
+            raise ValueError("Palette quantization is supported only for png")
+
+
+PROFILES = {
+    "print": RenderProfile(),
+    "phone": RenderProfile(dpi=150, format="jpeg"),
+    "phone_webp": RenderProfile(dpi=150, format="webp", quality=80),
+    "compact": RenderProfile(dpi=120, colors=64),
+}
@@ -0,0 +1,88 @@
+import asyncio
+import importlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from config import config, create_logger
+
+logger = create_logger(__name__)
+
+# charts are rendered by functions of this module, imported by the workers only
+CHARTS_MODULE = "reports.charts"
+
+
+def _warm_up() -> None:
+    importlib.import_module(CHARTS_MODULE).warm_up()
+
+
+def _render(chart: str, *args) -> bytes:
+    return getattr(importlib.import_module(CHARTS_MODULE), chart)(*args)
+
+
+class ChartRendererBusy(Exception):
+    """Too many charts are waiting to be rendered."""
+
+
+class ChartRenderer:
+    """Renders charts in a pool of worker processes off the event loop.
+
+    Charts are named after their function in ``reports.charts``, so the bot
+    process never imports the rendering libraries. At most ``queue_size``
+    charts are submitted to the pool at once and at most ``queue_size`` more
+    wait for a free slot, further requests raise ChartRendererBusy instead of
+    piling up.
+    """
+
+    def __init__(self, workers: int, queue_size: int) -> None:
+        self._workers = workers
+        self._queue_size = queue_size
+        self._slots = asyncio.Semaphore(max(queue_size, workers))
+        self._waiting = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking would copy the db worker thread and sqlite connection
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_up,
+            )
+        return self._executor
+
+    async def render(self, chart: str, *args) -> bytes:
+        if self._slots.locked():
+            if self._waiting >= self._queue_size:
+                raise ChartRendererBusy(f"{self._waiting} charts are waiting")
+            self._waiting += 1
+            try:
+                await self._slots.acquire()
+            finally:
+                self._waiting -= 1
+        else:
+            await self._slots.acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_executor(), _render, chart, *args
+            )
+        finally:
+            self._slots.release()
+
+    async def warm_up(self) -> None:
+        """Start the workers before the first chart is requested."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        await asyncio.gather(
+            *(loop.run_in_executor(executor, _warm_up) for _ in range(self._workers))
+        )
+        logger.info("%s chart workers started", self._workers)
+
+    async def shutdown(self) -> None:
+        """Stop the workers once their running charts are done, off the event loop."""
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, cancel_futures=True)
+
+
+chart_renderer = ChartRenderer(config.chart_workers, config.chart_queue_size)
@@ -1,69 +1,118 @@
-from collections import defaultdict
-
-from telegram import CallbackQuery, Message
+from telegram import CallbackQuery, InlineKeyboardMarkup, Message
 
 import constants.callbacks as cb
-from backend.db import Category, Expense, ReportRequest, db_client
-from config import MONTH_START_DAY
+from backend.db import ReportRequest, db_client, period_calendar, period_range
+from config import PAGE_SIZE, config
+from reports.cache import ReportContent, report_cache
+from reports.chart_cache import chart_cache
 from reports.formater import (
     TrendData,
-    generate_chart,
-    generate_trend_chart,
     prepare_expense_message,
     prepare_expense_message_last,
     prepare_expense_message_month_trend,
 )
+from reports.profiles import PROFILES
+from utils import make_page_buttons
 
+chart_profiles = {
+    cb.report_total: PROFILES[config.chart_profile_total],
+    cb.report_trend: PROFILES[config.chart_profile_trend],
+}
 
-def _get_expenses_month_trend(report: ReportRequest) -> TrendData:
-    expenses = db_client.get_expenses_month_trend(report)
-
-    categories: set[Category] = set()
-    accomulted_expenses: list[dict[Category, list[Expense]]] = []
-    months = []
 
-    curr_month = 0
-    month_expenses: dict[Category, list[Expense]] = defaultdict(list)
-    for date, values in expenses.items():
-        _, month, day = [int(d) for d in date.split("-")]
-        if day >= MONTH_START_DAY and month > curr_month:
-            accomulted_expenses.append(month_expenses)
-            months.append(str(month - 1))
-            month_expenses = defaultdict(list)
-            curr_month = month
-        for expense in values:
-            month_expenses[expense.category].append(expense)
-            categories.add(expense.category)
+def _period_label(period: str, current_period: str, years: bool) -> str:
+    if period == current_period:
+        return "current"
+    if years:
+        return f"{period[5:7]}.{period[2:4]}"
+    return str(int(period[5:7]))
 
-    accomulted_expenses.append(month_expenses)
-    months.append("current")
 
-    return TrendData(categories, months, accomulted_expenses)
+async def _get_expenses_month_trend(report: ReportRequest) -> TrendData:
+    expenses = await db_client.get_expenses_month_trend(report)
+    current_period = period_calendar.current()
+    first_period = min(expenses, default=current_period)
+    # periods without expenses are kept so the chart has no holes
+    periods = period_range(first_period, max([current_period, *expenses]))
+    years = periods[0][:4] != periods[-1][:4]
+    months = [_period_label(period, current_period, years) for period in periods]
+    return TrendData.from_expenses(expenses, periods, months)
 
 
-async def get_expenses_total(query: CallbackQuery, report: ReportRequest) -> Message:
-    expenses = db_client.get_expenses_total(report)
+async def _build_expenses_total(report: ReportRequest) -> ReportContent:
+    expenses = await db_client.get_expenses_total(report)
     message, chart_data = prepare_expense_message(expenses, report.user, report.all)
-    chart = generate_chart(chart_data)
-    msg = await query.get_bot().send_photo(report.user.id, chart, message)
-    return msg
+    chart = await chart_cache.render(
+        "generate_chart", chart_data, chart_profiles[cb.report_total]
+    )
+    return ReportContent(message, chart)
 
 
-async def get_expenses_list(query: CallbackQuery, report: ReportRequest) -> Message:
-    expenses = db_client.get_expenses_last(report)
-    message = prepare_expense_message_last(expenses, report.user, report.all)
-    msg = await query.get_bot().send_message(report.user.id, message)
-    return msg
+async def _build_expenses_list(report: ReportRequest) -> ReportContent:
+    page = await db_client.get_expenses_last(report, PAGE_SIZE)
+    return ReportContent(
+        prepare_expense_message_last(page.expenses, report.user, report.all),
+        next_page=page.next_page,
+    )
 
 
-async def get_expenses_trend(query: CallbackQuery, report: ReportRequest) -> Message:
-    expenses = _get_expenses_month_trend(report)
+async def _build_expenses_trend(report: ReportRequest) -> ReportContent:
+    expenses = await _get_expenses_month_trend(report)
     message = prepare_expense_message_month_trend(expenses, report.user, report.all)
-    chart = generate_trend_chart(expenses, report.user, report.all)
-    msg = await query.get_bot().send_photo(report.user.id, chart, message)
+    labels, series = expenses.get_chart_data(report.user, report.all)
+    chart = await chart_cache.render(
+        "generate_trend_chart",
+        labels,
+        series,
+        expenses.months,
+        chart_profiles[cb.report_trend],
+    )
+    return ReportContent(message, chart)
+
+
+async def _send_chart(
+    query: CallbackQuery, report: ReportRequest, content: ReportContent
+) -> Message:
+    chart = content.chart or ""
+    photo = await chart_cache.get_photo(chart)
+    msg = await query.get_bot().send_photo(report.user.id, photo, content.message)
+    await chart_cache.save_file_id(chart, msg)
     return msg
 
 
+async def get_expenses_total(
+    query: CallbackQuery, report: ReportRequest
+) -> tuple[Message, tuple]:
+    content = await report_cache.get_or_build(
+        cb.report_total, report, _build_expenses_total
+    )
+    return await _send_chart(query, report, content), ()
+
+
+async def get_expenses_list(
+    query: CallbackQuery, report: ReportRequest
+) -> tuple[Message, tuple]:
+    content = await report_cache.get_or_build(
+        cb.report_list, report, _build_expenses_list
+    )
+    buttons = make_page_buttons(report.after, content.next_page)
+    msg = await query.get_bot().send_message(
+        report.user.id,
+        content.message,
+        reply_markup=InlineKeyboardMarkup([buttons]) if buttons else None,
+    )
+    return msg, content.next_page
+
+
+async def get_expenses_trend(
+    query: CallbackQuery, report: ReportRequest
+) -> tuple[Message, tuple]:
+    content = await report_cache.get_or_build(
+        cb.report_trend, report, _build_expenses_trend
+    )
+    return await _send_chart(query, report, content), ()
+
+
 func_map = {
     cb.report_list: get_expenses_list,
     cb.report_total: get_expenses_total,
@@ -71,8 +120,9 @@ func_map = {
 }
 
 
-def get_expenses_list_with_ids(report: ReportRequest) -> tuple[str, dict]:
-    expenses = db_client.get_expenses_last(report)
-    message = prepare_expense_message_last(expenses, report.user, report.all)
-    id_map = {i: id for i, id in enumerate(expenses, 1)}
-    return (message, id_map)
+async def get_expenses_list_with_ids(
+    report: ReportRequest,
+) -> tuple[str, tuple[int, ...], tuple]:
+    page = await db_client.get_expenses_last(report, PAGE_SIZE)
+    message = prepare_expense_message_last(page.expenses, report.user, report.all)
+    return (message, tuple(page.expenses), page.next_page)
@@ -0,0 +1,67 @@
+"""Per-user conversation state kept between updates."""
+from dataclasses import dataclass, field
+
+from telegram.ext import CallbackContext, ExtBot
+
+from backend.db import Group
+from constants.userdata import UserData
+
+
+@dataclass(slots=True)
+class Session:
+    """State of one user, the ``context.user_data`` of the application.
+
+    Only ids and short strings are kept, telegram objects are not, so every
+    user pickles to a few hundred bytes in the persistence.
+    """
+
+    # last menu message, deleted before the next one is sent
+    msg_id: int | None = None
+    group_id: int | None = None
+    category_id: int | None = None
+    # expenses of the listed page, the user picks them by position
+    expense_ids: tuple[int, ...] = ()
+    all: bool = False
+    func: str | None = None
+    group_action: str | None = None
+    ordering: str | None = None
+    # page cursors of the listing, the last one is the current page
+    pages: list[tuple] = field(default_factory=lambda: [()])
+    next_page: tuple = ()
+
+    @property
+    def group(self) -> Group | None:
+        return Group(self.group_id) if self.group_id is not None else None
+
+    @group.setter
+    def group(self, group: Group | None) -> None:
+        self.group_id = group.id if group is not None else None
+
+    @classmethod
+    def load(cls, data: "Session | dict") -> "Session":
+        """Session of persisted user data, converting the old dict shape."""
+        return data if isinstance(data, cls) else cls.from_dict(data)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Session":
+        """Session of user data saved as a dict keyed by UserData."""
+        message = data.get(UserData.msg_id)
+        group = data.get(UserData.group)
+        category = data.get(UserData.category)
+        id_map = data.get(UserData.id_map) or {}
+        return cls(
+            msg_id=getattr(message, "id", message),
+            group_id=group.id if group else None,
+            category_id=category.id if category else None,
+            expense_ids=tuple(id_map[i] for i in sorted(id_map)),
+            all=bool(data.get(UserData.all)),
+            func=data.get(UserData.func),
+            group_action=data.get(UserData.group_action),
+            ordering=data.get(UserData.ordering),
+            pages=data.get(UserData.pages) or [()],
+            next_page=data.get(UserData.next_page) or (),
+        )
+
+
+# context of the handlers, whose user_data is the Session of the user
+Context = CallbackContext[ExtBot, Session, dict, dict]
@@ -0,0 +1,15 @@
+import os
+
+# config reads the token when imported
+os.environ.setdefault("bot_token", "123:test")
+
+import pytest  # noqa: E402
+
+from backend.db import SqliteClient  # noqa: E402
+
+
+@pytest.fixture
+def client(tmp_path):
+    client = SqliteClient(str(tmp_path / "expenses.db"))
+    yield client
+    client.close()
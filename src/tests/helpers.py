@@ -0,0 +1,17 @@
+import sqlite3
+
+from backend.db import Category, Expense, Group, SqliteClient, User
+
+
+def set_created_at(client: SqliteClient, ids: list[int], created_at: str) -> None:
+    """Move expenses to another period, then rebuild the rollup they are counted in."""
+    with sqlite3.connect(client.path) as conn:
+        conn.executemany(
+            "UPDATE expenses SET CREATED_AT = ? WHERE ID = ?",
+            [(created_at, id) for id in ids],
+        )
+    client.rebuild_rollup()
+
+
+def expense(amount: int, category: int, user: int = 1, group: int = 1) -> Expense:
+    return Expense(amount, Category(category), User(user), Group(group))
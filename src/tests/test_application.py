@@ -0,0 +1,103 @@
+import asyncio
+
+from telegram import Update
+from telegram.ext import ApplicationBuilder, TypeHandler
+
+from application import UserOrderedApplication
+from benchmarks.common import TelegramStub, text_update
+
+
+def build(max_in_flight: int = 4) -> UserOrderedApplication:
+    return (
+        ApplicationBuilder()
+        .token("1:test")
+        .request(TelegramStub())
+        .get_updates_request(TelegramStub())
+        .application_class(UserOrderedApplication, {"max_in_flight": max_in_flight})
+        .concurrent_updates(True)
+        .build()
+    )
+
+
+async def put(application: UserOrderedApplication, update_id: int, user: int) -> None:
+    update = Update.de_json(text_update(update_id, user, "x"), application.bot)
+    await application.update_queue.put(update)
+
+
+def test_updates_of_a_user_are_handled_in_order_one_at_a_time():
+    handled: dict[int, list[int]] = {}
+    busy: set[int] = set()
+    overlaps = 0
+
+    async def handler(update: Update, context) -> None:
+        nonlocal overlaps
+        user = update.effective_user.id
+        overlaps += user in busy
+        busy.add(user)
+        await asyncio.sleep(0.001 * (update.update_id % 3))
+        busy.discard(user)
+        handled.setdefault(user, []).append(update.update_id)
+
+    async def run() -> None:
+        application = build()
+        application.add_handler(TypeHandler(Update, handler))
+        async with application:
+            await application.start()
+            for update_id in range(60):
+                await put(application, update_id, update_id % 3)
+            await application.stop()
+
+    asyncio.run(run())
+    assert overlaps == 0
+    assert handled == {user: list(range(user, 60, 3)) for user in range(3)}
+
+
+def test_a_flooding_user_does_not_hold_back_the_others():
+    handled: list[int] = []
+
+    async def handler(update: Update, context) -> None:
+        await asyncio.sleep(0.001)
+        handled.append(update.effective_user.id)
+
+    async def run() -> None:
+        # more updates than the concurrent update slots of the application
+        application = build()
+        application.add_handler(TypeHandler(Update, handler))
+        async with application:
+            await application.start()
+            for update_id in range(600):
+                await put(application, update_id, 1)
+            await put(application, 600, 2)
+            await application.stop()
+
+    asyncio.run(run())
+    assert len(handled) == 601
+    assert handled.index(2) < 10
+
+
+def test_stop_handles_the_queued_updates():
+    handled: list[int] = []
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def handler(update: Update, context) -> None:
+        started.set()
+        await release.wait()
+        handled.append(update.update_id)
+
+    async def run() -> None:
+        application = build()
+        application.add_handler(TypeHandler(Update, handler))
+        async with application:
+            await application.start()
+            for update_id in range(5):
+                await put(application, update_id, 1)
+            await started.wait()
+            await asyncio.sleep(0.01)
+            stop = asyncio.create_task(application.stop())
+            await asyncio.sleep(0.01)
+            release.set()
+            await stop
+
+    asyncio.run(run())
+    assert handled == list(range(5))
@@ -0,0 +1,77 @@
+import asyncio
+
+from backend.db import AsyncDataBaseClient, Category, Group
+from categories.categories import CategoryRegistry
+
+
+class SlowCategories:
+    """load_categories of a database, waiting for ``release`` when it is set."""
+
+    def __init__(self) -> None:
+        self.loads = 0
+        self.release: asyncio.Event | None = None
+
+    async def load_categories(self, categories: dict, group: Group) -> None:
+        self.loads += 1
+        if self.release is not None:
+            await self.release.wait()
+        categories[1] = Category(1, f"food {self.loads}")
+
+
+def test_categories_are_loaded_once_per_group():
+    db = SlowCategories()
+    registry = CategoryRegistry(db)  # type: ignore[arg-type]
+
+    async def run() -> None:
+        db.release = asyncio.Event()
+        loads = [asyncio.create_task(registry.get(Group(1))) for _ in range(2)]
+        await asyncio.sleep(0)
+        db.release.set()
+        # concurrent loads share the one that finished first
+        first, second = await asyncio.gather(*loads)
+        assert first is second
+        assert await registry.get(Group(1)) is first
+        await registry.get(Group(2))
+
+    asyncio.run(run())
+    assert db.loads == 3
+
+
+def test_categories_loaded_during_invalidate_are_not_kept():
+    db = SlowCategories()
+    registry = CategoryRegistry(db)  # type: ignore[arg-type]
+
+    async def run() -> None:
+        db.release = asyncio.Event()
+        loading = asyncio.create_task(registry.get(Group(1)))
+        await asyncio.sleep(0)
+        registry.invalidate(Group(1))
+        db.release.set()
+        stale = await loading
+        assert [category.name for category in stale] == ["food 1"]
+        fresh = await registry.get(Group(1))
+        assert [category.name for category in fresh] == ["food 2"]
+        assert await registry.get(Group(1)) is fresh
+
+    asyncio.run(run())
+
+
+def test_changes_are_kept_in_place(client):
+    group = client.create_group(1, "group")
+    registry = CategoryRegistry(AsyncDataBaseClient(client))
+
+    async def run() -> None:
+        categories = await registry.get(group)
+        await categories.append("food")
+        await categories.append("car")
+        food = categories.get_category_id("food")
+        await categories.delete(food)
+        assert food not in categories
+        assert [category.name for category in categories] == ["car"]
+
+        registry.invalidate()
+        reloaded = await registry.get(group)
+        assert reloaded is not categories
+        assert [category.name for category in reloaded] == ["car"]
+
+    asyncio.run(run())
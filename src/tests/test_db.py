@@ -0,0 +1,40 @@
+import sqlite3
+
+from backend.db import SqliteClient
+from tests.helpers import expense, set_created_at
+
+ROLLUP = "SELECT GROUP_ID, PERIOD, CATEGORY_ID, USER_ID, AMOUNT, COUNT FROM expense_rollup ORDER BY 1, 2, 3, 4"
+
+
+def rollup(client: SqliteClient) -> list[tuple]:
+    with sqlite3.connect(client.path) as conn:
+        return conn.execute(ROLLUP).fetchall()
+
+
+def test_rollup_matches_rebuild_after_writes(client):
+    ids = client.insert_many(
+        [expense(100 * i, 1 + i % 3, 1 + i % 2, 1 + i % 2) for i in range(1, 13)]
+    )
+    set_created_at(client, ids[:4], "2021-03-10 12:00:00")
+    set_created_at(client, ids[4:6], "2021-04-02 08:30:00")
+
+    ids += client.insert_many([expense(50, 2), expense(70, 3, user=2)])
+    # repeated ids are moved and deleted once
+    client.move_expenses([ids[0], ids[0], ids[5], ids[12]], 4)
+    client.del_expenses([ids[1], ids[1], ids[13]])
+    client.move_expenses([ids[2]], 5)
+    expected = rollup(client)
+
+    client.rebuild_rollup()
+    assert rollup(client) == expected
+
+
+def test_rollup_rows_of_deleted_expenses_are_removed(client):
+    ids = client.insert_many([expense(100, 1), expense(200, 1), expense(300, 2)])
+    client.move_expenses(ids[:2], 2)
+    client.del_expenses([ids[0], ids[1], ids[1]])
+
+    rows = rollup(client)
+    assert [(row[2], row[4], row[5]) for row in rows] == [(2, 300, 1)]
+    client.rebuild_rollup()
+    assert rollup(client) == rows
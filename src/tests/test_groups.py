@@ -0,0 +1,72 @@
+import asyncio
+
+from backend.db import AsyncDataBaseClient, Group, User
+from groups.groups import GroupMembership
+
+
+def test_group_changes_update_the_loaded_members(client):
+    membership = GroupMembership(AsyncDataBaseClient(client))
+
+    async def run() -> None:
+        assert await membership.get_user_groups(2) == []
+        family = await membership.create_group(1, "family")
+        work = await membership.create_group(1, "work")
+        assert await membership.get_user_groups(1) == [family, work]
+
+        # callbacks carry the group id only, members know the name
+        await membership.add_user_to_group(Group(family.id), User(2))
+        await membership.add_user_to_group(Group(work.id), User(2))
+        assert await membership.get_user_groups(2) == [family, work]
+
+        await membership.delete_user_from_group(work, User(2))
+        assert await membership.get_user_groups(2) == [family]
+        await membership.delete_group(family)
+        assert await membership.get_user_groups(1) == [work]
+        assert await membership.get_user_groups(2) == []
+
+    asyncio.run(run())
+
+
+def test_invalidate_picks_up_changes_made_elsewhere(client):
+    membership = GroupMembership(AsyncDataBaseClient(client))
+
+    async def run() -> None:
+        group = await membership.create_group(1, "family")
+        assert await membership.get_user_groups(2) == []
+        client.add_user_to_group(group, User(2))
+        assert await membership.get_user_groups(2) == []
+        membership.invalidate(2)
+        assert await membership.get_user_groups(2) == [group]
+
+    asyncio.run(run())
+
+
+class SlowGroups:
+    """get_user_groups of a database, answering once ``release`` is set."""
+
+    def __init__(self) -> None:
+        self.release = asyncio.Event()
+        self.groups = [Group(1, "family")]
+
+    async def get_user_groups(self, user_id: int) -> list[Group]:
+        groups = list(self.groups)
+        await self.release.wait()
+        return groups
+
+    async def delete_user_from_group(self, group: Group, user: User) -> None:
+        self.groups.remove(group)
+
+
+def test_groups_loaded_during_a_change_are_not_kept():
+    db = SlowGroups()
+    membership = GroupMembership(db)  # type: ignore[arg-type]
+
+    async def run() -> None:
+        loading = asyncio.create_task(membership.get_user_groups(1))
+        await asyncio.sleep(0)
+        await membership.delete_user_from_group(Group(1, "family"), User(1))
+        db.release.set()
+        assert await loading == [Group(1, "family")]
+        assert await membership.get_user_groups(1) == []
+
+    asyncio.run(run())
@@ -0,0 +1,94 @@
+import asyncio
+import sqlite3
+
+from backend.db import AsyncDataBaseClient, InsertBuffer
+from tests.helpers import expense
+
+
+class Inserts:
+    """insert_many of a database, recording the batches it is called with."""
+
+    def __init__(self, fail_amount: int | None = None) -> None:
+        self.batches: list[list[int]] = []
+        self._fail_amount = fail_amount
+        self._last_id = 0
+
+    async def __call__(self, expenses) -> list[int]:
+        amounts = [expense.amount for expense in expenses]
+        if self._fail_amount in amounts:
+            raise ValueError("bad expense")
+        self.batches.append(amounts)
+        ids = list(range(self._last_id + 1, self._last_id + len(expenses) + 1))
+        self._last_id = ids[-1]
+        return ids
+
+
+def test_inserts_are_written_in_batches_of_max_rows():
+    inserts = Inserts()
+
+    async def run() -> list[int]:
+        buffer = InsertBuffer(inserts, max_rows=3, max_delay=60)
+        ids = await asyncio.gather(*(buffer.insert(expense(i, 1)) for i in range(6)))
+        assert buffer.stats()["batches"] == 2
+        assert buffer.stats()["max_batch"] == 3
+        assert buffer.stats()["mean_batch"] == 3
+        return ids
+
+    assert asyncio.run(run()) == [1, 2, 3, 4, 5, 6]
+    assert inserts.batches == [[0, 1, 2], [3, 4, 5]]
+
+
+def test_a_partial_batch_is_written_after_max_delay():
+    inserts = Inserts()
+
+    async def run() -> None:
+        buffer = InsertBuffer(inserts, max_rows=100, max_delay=0.01)
+        assert await asyncio.gather(
+            buffer.insert(expense(1, 1)), buffer.insert(expense(2, 1))
+        ) == [1, 2]
+
+    asyncio.run(run())
+    assert inserts.batches == [[1, 2]]
+
+
+def test_flush_writes_the_queued_inserts():
+    inserts = Inserts()
+
+    async def run() -> None:
+        buffer = InsertBuffer(inserts, max_rows=100, max_delay=60)
+        task = asyncio.create_task(buffer.insert(expense(1, 1)))
+        await asyncio.sleep(0)
+        await buffer.flush()
+        assert task.done() and task.result() == 1
+        assert buffer.stats()["rows"] == 1
+
+    asyncio.run(run())
+
+
+def test_a_bad_expense_fails_only_its_caller():
+    inserts = Inserts(fail_amount=2)
+
+    async def run() -> list:
+        buffer = InsertBuffer(inserts, max_rows=3, max_delay=60)
+        return await asyncio.gather(
+            *(buffer.insert(expense(i, 1)) for i in (1, 2, 3)), return_exceptions=True
+        )
+
+    first, failed, third = asyncio.run(run())
+    assert (first, third) == (1, 2)
+    assert isinstance(failed, ValueError)
+    assert inserts.batches == [[1], [3]]
+
+
+def test_the_client_commits_buffered_inserts(client):
+    async def run() -> None:
+        db = AsyncDataBaseClient(client, insert_batch_rows=10, insert_batch_delay=60)
+        tasks = [asyncio.create_task(db.insert(expense(i, 1))) for i in range(1, 4)]
+        await asyncio.sleep(0)
+        await db.flush()
+        assert sorted(await asyncio.gather(*tasks)) == [1, 2, 3]
+        assert db.insert_stats()["batches"] == 1
+
+    asyncio.run(run())
+    with sqlite3.connect(client.path) as conn:
+        assert conn.execute("SELECT count(*) FROM expenses").fetchone() == (3,)
@@ -0,0 +1,73 @@
+import pytest
+
+from backend.db import ORDERINGS, Category, Expense, Group, ReportRequest, User
+from config import PAGE_SIZE
+from reports.formater import prepare_expense_message_last
+from tests.helpers import expense, set_created_at
+
+
+@pytest.mark.parametrize("ordering", ORDERINGS)
+def test_pages_list_every_expense_once_in_order(client, ordering):
+    group = client.create_group(1, "group")
+    categories = [client.insert_category(name, group) for name in ("b", "a", "c")]
+    # equal timestamps, categories and amounts are ordered by id
+    ids = client.insert_many(
+        [expense(100 * (i % 4), categories[i % 3], group=group.id) for i in range(23)]
+    )
+    set_created_at(client, ids[::2], "2021-05-01 00:00:00")
+    request = ReportRequest(User(1), group, ordering, "2000-01-01")
+
+    everything = client.get_expenses_last(request, 100)
+    assert sorted(everything.expenses) == ids
+    assert everything.next_page == ()
+
+    listed: list[int] = []
+    after: tuple = ()
+    while True:
+        page = client.get_expenses_last(
+            ReportRequest(User(1), group, ordering, "2000-01-01", after=after), 5
+        )
+        listed += page.expenses
+        if not page.next_page:
+            break
+        assert len(page.expenses) == 5
+        after = page.next_page
+    assert listed == list(everything.expenses)
+
+
+def test_pages_follow_the_ordering(client):
+    group = client.create_group(1, "group")
+    food = client.insert_category("food", group)
+    car = client.insert_category("car", group)
+    ids = client.insert_many(
+        [
+            expense(300, food, group=group.id),
+            expense(100, car, group=group.id),
+            expense(300, car, group=group.id),
+            expense(200, food, group=group.id),
+        ]
+    )
+    set_created_at(client, [ids[3]], "2021-05-01 00:00:00")
+
+    def listed(ordering: str) -> list[int]:
+        request = ReportRequest(User(1), group, ordering, "2000-01-01")
+        page = client.get_expenses_last(request, 2)
+        after = ReportRequest(
+            User(1), group, ordering, "2000-01-01", after=page.next_page
+        )
+        return [*page.expenses, *client.get_expenses_last(after, 2).expenses]
+
+    assert listed("created_at") == [ids[3], ids[0], ids[1], ids[2]]
+    assert listed("category, amount desc") == [ids[2], ids[1], ids[0], ids[3]]
+
+
+def test_a_full_page_fits_in_a_message():
+    expenses = {
+        id: Expense(
+            123_456_789, Category(1, "c" * 200), User(1), Group(1), "comment " * 100
+        )
+        for id in range(PAGE_SIZE)
+    }
+    message = prepare_expense_message_last(expenses, User(1), False)
+    assert len(message.splitlines()) == PAGE_SIZE + 2
+    assert len(message) <= 4096
@@ -0,0 +1,75 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+from backend.db import PeriodCalendar, period_range, period_start_sql
+
+
+class Calendar(PeriodCalendar):
+    """Calendar of a fixed day, counting how often the periods are computed."""
+
+    def __init__(self, day: date) -> None:
+        super().__init__(start_day=10)
+        self.day = day
+        self.computed = 0
+
+    def today(self) -> date:
+        return self.day
+
+    def _periods_until(self, today: date, count: int) -> list[str]:
+        self.computed += 1
+        return super()._periods_until(today, count)
+
+
+@pytest.mark.parametrize(
+    "day, current",
+    [
+        (date(2021, 3, 9), "2021-02-10"),
+        (date(2021, 3, 10), "2021-03-10"),
+        (date(2021, 3, 31), "2021-03-10"),
+        (date(2021, 1, 9), "2020-12-10"),
+        (date(2021, 12, 10), "2021-12-10"),
+    ],
+)
+def test_current_period_starts_on_the_start_day(day, current):
+    assert Calendar(day).current() == current
+
+
+def test_previous_periods_cross_the_year():
+    calendar = Calendar(date(2021, 2, 1))
+    assert calendar.periods(3) == ["2021-01-10", "2020-12-10", "2020-11-10"]
+
+
+def test_periods_are_computed_once_a_day():
+    calendar = Calendar(date(2021, 3, 9))
+    calendar.current()
+    calendar.periods(1)
+    assert calendar.computed == 1
+    calendar.periods(4)
+    assert calendar.computed == 2
+    calendar.day = date(2021, 3, 10)
+    assert calendar.current() == "2021-03-10"
+    assert calendar.computed == 3
+
+
+def test_period_range_includes_both_ends():
+    assert period_range("2020-11-10", "2021-02-10") == [
+        "2020-11-10",
+        "2020-12-10",
+        "2021-01-10",
+        "2021-02-10",
+    ]
+    assert period_range("2021-02-10", "2021-02-10") == ["2021-02-10"]
+
+
+@pytest.mark.parametrize(
+    "created_at",
+    ["2021-03-09 23:59:59", "2021-03-10 00:00:00", "2021-01-05 12:00:00"],
+)
+def test_sql_periods_match_the_calendar(created_at):
+    with sqlite3.connect(":memory:") as conn:
+        (period,) = conn.execute(
+            f"SELECT {period_start_sql(':created_at')}", {"created_at": created_at}
+        ).fetchone()
+    assert period == Calendar(date.fromisoformat(created_at[:10])).current()
@@ -0,0 +1,74 @@
+import asyncio
+import pickle
+import sqlite3
+
+from telegram.ext import ExtBot
+
+from backend.persistence import SqlitePersistence
+
+
+def persistence(tmp_path, **kwargs) -> SqlitePersistence:
+    persistence = SqlitePersistence(tmp_path / "persistence.db", **kwargs)
+    persistence.set_bot(ExtBot("1:test"))
+    return persistence
+
+
+def test_unchanged_rows_are_not_written(tmp_path):
+    state = persistence(tmp_path)
+
+    async def run() -> None:
+        await state.update_user_data(1, {"group": 1})
+        with sqlite3.connect(tmp_path / "persistence.db") as conn:
+            conn.execute("UPDATE user_data SET DATA = x'00'")
+        # the same data is skipped, changed data is written
+        await state.update_user_data(1, {"group": 1})
+        await state.update_user_data(2, {"group": 1})
+        await state.flush()
+
+    asyncio.run(run())
+    with sqlite3.connect(tmp_path / "persistence.db") as conn:
+        rows = dict(conn.execute("SELECT ID, DATA FROM user_data"))
+    assert rows[1] == b"\x00"
+    assert pickle.loads(rows[2]) == {"group": 1}
+
+
+def test_state_is_read_back_after_flush(tmp_path):
+    state = persistence(tmp_path, load_user_data=lambda data: data["group"])
+
+    async def run() -> tuple:
+        await state.update_user_data(1, {"group": 3})
+        await state.update_conversation("groups", (1, 1), 2)
+        await state.update_conversation("groups", (2, 2), 2)
+        await state.update_conversation("groups", (2, 2), None)
+        await state.flush()
+        return await state.get_user_data(), await state.get_conversations("groups")
+
+    assert asyncio.run(run()) == ({1: 3}, {(1, 1): 2})
+
+
+def test_pickle_persistence_file_is_imported_once(tmp_path):
+    pickle_path = tmp_path / "persistance_states"
+    with pickle_path.open("wb") as file:
+        pickle.dump(
+            {
+                "user_data": {1: {"group": 1}},
+                "chat_data": {1: {}},
+                "bot_data": {"users": 1},
+                "callback_data": None,
+                "conversations": {"groups": {(1, 1): 2, (2, 2): None}},
+            },
+            file,
+        )
+    state = persistence(tmp_path, pickle_path=pickle_path)
+
+    async def run() -> tuple:
+        return (
+            await state.get_user_data(),
+            await state.get_bot_data(),
+            await state.get_callback_data(),
+            await state.get_conversations("groups"),
+        )
+
+    assert asyncio.run(run()) == ({1: {"group": 1}}, {"users": 1}, None, {(1, 1): 2})
+    assert not pickle_path.exists()
+    assert (tmp_path / "persistance_states.imported").exists()
@@ -0,0 +1,28 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from reports import renderer
+from reports.renderer import ChartRenderer, ChartRendererBusy
+
+
+def test_requests_over_the_queue_are_rejected(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(renderer, "_render", lambda chart, *args: release.wait(5))
+    chart_renderer = ChartRenderer(workers=1, queue_size=2)
+    monkeypatch.setattr(
+        chart_renderer, "_get_executor", lambda: ThreadPoolExecutor(max_workers=2)
+    )
+
+    async def run() -> None:
+        # two charts submitted and two waiting for a slot
+        tasks = [asyncio.create_task(chart_renderer.render("chart")) for _ in range(4)]
+        await asyncio.sleep(0.01)
+        with pytest.raises(ChartRendererBusy):
+            await chart_renderer.render("chart")
+        release.set()
+        assert await asyncio.gather(*tasks) == [True] * 4
+
+    asyncio.run(run())
@@ -0,0 +1,74 @@
+import asyncio
+from datetime import date
+
+from backend.db import Group, ReportRequest, User
+from reports import cache
+from reports.cache import ReportCache, ReportContent
+
+
+class Builds:
+    """Build function of the cache, counting its calls."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def __call__(self, report: ReportRequest) -> ReportContent:
+        self.calls += 1
+        return ReportContent(f"report {self.calls}")
+
+
+def request(user: int = 1, group: int = 1, all: bool = False) -> ReportRequest:
+    return ReportRequest(User(user), Group(group), "created_at", "2021-01-01", all)
+
+
+def get(report_cache: ReportCache, report: ReportRequest, build) -> str:
+    content = asyncio.run(report_cache.get_or_build("list", report, build))
+    return content.message
+
+
+def test_reports_are_built_once_until_invalidated():
+    report_cache, build = ReportCache(10_000, 60), Builds()
+
+    assert get(report_cache, request(), build) == "report 1"
+    assert get(report_cache, request(), build) == "report 1"
+    get(report_cache, request(group=2), build)
+    report_cache.invalidate(Group(1))
+    assert get(report_cache, request(), build) == "report 3"
+    assert get(report_cache, request(group=2), build) == "report 2"
+    assert report_cache.stats() == {"hits": 2, "misses": 3, "size": 2}
+
+
+def test_report_built_while_the_group_changes_is_not_kept():
+    report_cache = ReportCache(10_000, 60)
+
+    async def build(report: ReportRequest) -> ReportContent:
+        report_cache.invalidate(report.group)
+        return ReportContent("stale")
+
+    get(report_cache, request(), build)
+    assert report_cache.stats()["size"] == 0
+
+
+def test_group_reports_are_shared_by_the_members():
+    report_cache, build = ReportCache(10_000, 60), Builds()
+
+    get(report_cache, request(user=1, all=True), build)
+    assert get(report_cache, request(user=2, all=True), build) == "report 1"
+    assert get(report_cache, request(user=2), build) == "report 2"
+    assert get(report_cache, request(user=3), build) == "report 3"
+
+
+def test_reports_are_kept_per_day(monkeypatch):
+    report_cache, build = ReportCache(10_000, 60), Builds()
+
+    class Calendar:
+        day = date(2021, 1, 10)
+
+        def today(self) -> date:
+            return self.day
+
+    calendar = Calendar()
+    monkeypatch.setattr(cache, "period_calendar", calendar)
+    get(report_cache, request(), build)
+    calendar.day = date(2021, 1, 11)
+    assert get(report_cache, request(), build) == "report 2"
@@ -0,0 +1,45 @@
+from backend.db import Category, Group
+from constants.userdata import UserData
+from session import Session
+
+
+class Message:
+    id = 7
+
+
+def test_legacy_user_data_is_converted():
+    session = Session.load(
+        {
+            UserData.msg_id: Message(),
+            UserData.group: Group(3, "family"),
+            UserData.category: Category(5, "food"),
+            UserData.id_map: {2: 12, 1: 11, 3: 13},
+            UserData.all: 1,
+            UserData.func: "total",
+            UserData.ordering: "created_at",
+            UserData.pages: [(), ("2021-01-01", 11)],
+        }
+    )
+    assert session == Session(
+        msg_id=7,
+        group_id=3,
+        category_id=5,
+        expense_ids=(11, 12, 13),
+        all=True,
+        func="total",
+        ordering="created_at",
+        pages=[(), ("2021-01-01", 11)],
+    )
+    assert session.group == Group(3)
+
+
+def test_empty_legacy_user_data_is_a_new_session():
+    assert Session.from_dict({}) == Session()
+    assert Session.from_dict({UserData.msg_id: 4}).msg_id == 4
+
+
+def test_sessions_are_loaded_as_they_are():
+    session = Session(group_id=1)
+    assert Session.load(session) is session
+    session.group = None
+    assert session.group_id is None
@@ -2,13 +2,13 @@ from itertools import islice
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram._utils.types import ReplyMarkup
-from telegram.ext import ContextTypes
 
+import constants.callbacks as cb
 from backend.db import Group
 from categories.categories import Categories
 from config import create_logger
-from constants.userdata import UserData
 from decorators import delete_old_message
+from session import Context, Session
 
 logger = create_logger(__name__)
 
@@ -33,20 +33,49 @@ def make_inline_menu(
     return replay_markup
 
 
+def turn_page(session: Session, data: str) -> tuple:
+    """Move the page cursor stack for a page button and return the page cursor.
+
+    Any other callback starts a new listing from the first page.
+    """
+    pages = session.pages or [()]
+    if data == cb.page_next and session.next_page:
+        pages.append(session.next_page)
+    elif data == cb.page_prev and len(pages) > 1:
+        pages.pop()
+    elif data not in (cb.page_next, cb.page_prev):
+        pages = [()]
+    session.pages = pages
+    return pages[-1]
+
+
+def make_page_buttons(page: tuple, next_page: tuple) -> list[InlineKeyboardButton]:
+    buttons = []
+    if page:
+        buttons.append(InlineKeyboardButton("Назад", callback_data=cb.page_prev))
+    if next_page:
+        buttons.append(InlineKeyboardButton("Дальше", callback_data=cb.page_next))
+    return buttons
+
+
 @delete_old_message(logger)
 async def send_message(
     update: Update,
-    context: ContextTypes.DEFAULT_TYPE,
+    context: Context,
     message: str,
     reply_markup: ReplyMarkup | None = None,
 ) -> None:
 
-    context.user_data[UserData.msg_id] = await context.bot.send_message(
+    msg = await context.bot.send_message(
         update.effective_user.id, message, reply_markup=reply_markup
     )
+    context.user_data.msg_id = msg.id
 
 
-def validate_message_expense_ids(message: str, id_map: dict) -> list[int] | None:
+def validate_message_expense_ids(
+    message: str, expense_ids: tuple[int, ...]
+) -> list[int] | None:
+    """Expense ids of the comma separated positions of the listed page."""
     ids = message.split(",")
     expenses = []
     if not ids:
@@ -56,7 +85,7 @@ def validate_message_expense_ids(message: str, id_map: dict) -> list[int] | None
             expense_id = int(id)
         except ValueError:
             return None
-        if expense_id not in id_map:
+        if not 1 <= expense_id <= len(expense_ids):
             continue
-        expenses.append(id_map[expense_id])
+        expenses.append(expense_ids[expense_id - 1])
     return expenses